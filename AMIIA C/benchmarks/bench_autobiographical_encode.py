@@ -0,0 +1,87 @@
+"""
+Benchmark de codificación de AutobiographicalMemory - AMIIA-C
+Mide experiencias codificadas por segundo con encode_experience y el coste de la
+extracción de rasgos de los pensamientos frente al análisis anterior (varias pasadas).
+
+Uso:
+    python "AMIIA C/benchmarks/bench_autobiographical_encode.py" --traces 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.autobiographical_memory import AutobiographicalMemory, ThoughtFeatures  # noqa: E402
+from bench_semantic_embedding import build_corpus  # noqa: E402
+
+
+def build_experiences(n_traces: int, seed: int = 0):
+    rng = random.Random(seed)
+    thoughts_pool = build_corpus(512, 8, seed=seed)
+    experiences = []
+    for _ in range(n_traces):
+        emotional_state = {
+            'primary_emotion': rng.choice(['joy', 'sadness', 'curiosity', 'neutral']),
+            'primary_intensity': rng.random(),
+            'emotional_complexity_score': rng.random(),
+            'empathetic_response': {'empathy_level': rng.random()},
+        }
+        thoughts = rng.sample(thoughts_pool, rng.randint(2, 10))
+        context = {
+            'interaction_type': 'direct_communication',
+            'user_input': 'x' * rng.randint(10, 120),
+        }
+        experiences.append((emotional_state, thoughts, context))
+    return experiences
+
+
+def legacy_features(thoughts):
+    """Análisis de pensamientos anterior: varias pasadas con lower()/join()."""
+    metacognition = any('metacognición' in t.lower() for t in thoughts)
+    learning = 'aprend' in ' '.join(thoughts).lower() or 'entend' in ' '.join(thoughts).lower()
+    consciousness = any('conciencia' in t.lower() for t in thoughts)
+    return len(thoughts), metacognition, learning, consciousness
+
+
+async def bench_encode(experiences, capacity: int) -> float:
+    memory = AutobiographicalMemory(capacity=capacity)
+    now = datetime.now()
+    start = time.perf_counter()
+    for emotional_state, thoughts, context in experiences:
+        await memory.encode_experience(now, None, emotional_state, thoughts, context)
+    return len(experiences) / (time.perf_counter() - start)
+
+
+def bench_features(experiences, extract) -> float:
+    start = time.perf_counter()
+    for _, thoughts, _ in experiences:
+        extract(thoughts)
+    return len(experiences) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=10000)
+    parser.add_argument("--capacity", type=int, default=10000)
+    args = parser.parse_args()
+
+    experiences = build_experiences(args.traces)
+    print(f"{args.traces} experiencias, capacidad={args.capacity}")
+
+    legacy_rate = bench_features(experiences, legacy_features)
+    feature_rate = bench_features(experiences, ThoughtFeatures.extract)
+    print(f"  rasgos (anterior): {legacy_rate:>10.0f} experiencias/s")
+    print(f"  rasgos (1 pasada): {feature_rate:>10.0f} experiencias/s   speedup {feature_rate / legacy_rate:.1f}x")
+
+    encode_rate = asyncio.run(bench_encode(experiences, args.capacity))
+    print(f"  encode_experience: {encode_rate:>10.0f} experiencias/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark de inferencia de ConsciousnessNetwork - AMIIA-C
+Compara la latencia por ciclo (batch 1, CPU) de `call` en modo eager, el grafo
+compilado con tf.function y, opcionalmente, el grafo compilado con XLA, para
+un modo de ConsciousnessAttention.
+
+Uso:
+    python "AMIIA C/benchmarks/bench_consciousness_inference.py" --cycles 500 --xla
+    python "AMIIA C/benchmarks/bench_consciousness_inference.py" --attention-mode fused
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from bench_semantic_embedding import build_corpus  # noqa: E402
+
+
+def build_contexts(n_contexts: int, seed: int = 0):
+    """Contextos de trabajo sintéticos con las claves que produce WorkingMemory."""
+    rng = random.Random(seed)
+    texts = build_corpus(256, 12, seed=seed)
+    contexts = []
+    for _ in range(n_contexts):
+        contexts.append({
+            'integrated_thoughts': rng.sample(texts, rng.randint(1, 8)),
+            'integrated_emotions': {e: rng.random() for e in rng.sample(['joy', 'sadness', 'curiosity', 'fear'], 2)},
+            'integrated_memories': [{'id': i} for i in range(rng.randint(0, 3))],
+            'context_buffer': [{'user_input': rng.choice(texts)} for _ in range(rng.randint(0, 3))],
+            'working_memory_load': rng.random(),
+            'attention_summary': {'peak': rng.random(), 'mean': rng.random() / 2, 'newest': rng.random()},
+            'semantic_context': rng.sample(texts, rng.randint(0, 4)),
+        })
+    return contexts
+
+
+def bench_latency(features, infer, warmup: int = 10):
+    """Latencias por ciclo en milisegundos (incluye la copia del resultado al host)."""
+    import tensorflow as tf
+
+    for row in features[:warmup]:
+        infer(tf.constant(row[None, :]))['consciousness_state'].numpy()
+    latencies = []
+    for row in features:
+        start = time.perf_counter()
+        infer(tf.constant(row[None, :]))['consciousness_state'].numpy()
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=500)
+    parser.add_argument("--xla", action="store_true", help="medir también el grafo compilado con XLA")
+    parser.add_argument("--attention-mode", choices=("standard", "fused", "temporal"), default="standard")
+    args = parser.parse_args()
+
+    from neural_networks.consciousness_network import ConsciousnessNetwork
+
+    contexts = build_contexts(args.cycles)
+    variants = [("eager", dict(compiled_inference=False)),
+                ("tf.function", dict(compiled_inference=True))]
+    if args.xla:
+        variants.append(("tf.function+XLA", dict(compiled_inference=True, jit_compile=True)))
+
+    print(f"{args.cycles} ciclos, batch 1, CPU, atención {args.attention_mode}")
+    baseline = None
+    for name, options in variants:
+        network = ConsciousnessNetwork(attention_mode=args.attention_mode, **options)
+        features = network.feature_encoder.encode_batch(contexts)
+        latencies = bench_latency(features, network.infer)
+        median = float(np.median(latencies))
+        baseline = baseline or median
+        print(f"  {name:<16} p50 {median:7.3f} ms   p95 {np.percentile(latencies, 95):7.3f} ms"
+              f"   speedup {baseline / median:.1f}x")
+        if options.get("compiled_inference"):
+            traces = network._compiled_inference.experimental_get_tracing_count()
+            print(f"  {'':<16} trazas: {traces}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark del micro-batching de inferencia - AMIIA-C
+Compara inferencias por segundo con N ciclos concurrentes entre llamadas
+individuales a `forward` y el InferenceBatcher, sobre el runtime NumPy (por
+defecto, sin TensorFlow) o la red TensorFlow.
+
+Uso:
+    python "AMIIA C/benchmarks/bench_inference_batcher.py" --weights "AMIIA C/data/consciousness_weights.npz"
+    python "AMIIA C/benchmarks/bench_inference_batcher.py" --runtime tensorflow --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neural_networks.inference_batcher import InferenceBatcher  # noqa: E402
+from bench_consciousness_inference import build_contexts  # noqa: E402
+
+
+async def run_clients(forward, contexts, concurrency: int) -> float:
+    """Lanzar `concurrency` clientes que consumen los contextos; devuelve peticiones/s."""
+    queue = asyncio.Queue()
+    for context in contexts:
+        queue.put_nowait(context)
+
+    async def client():
+        while not queue.empty():
+            await forward(queue.get_nowait())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(contexts) / (time.perf_counter() - start)
+
+
+async def bench(network, contexts, concurrency: int, max_batch_size: int, max_wait_ms: float):
+    async def unbatched(context):
+        return network.forward(context)
+
+    # Calentamiento: trazar el grafo compilado (TensorFlow) antes de medir
+    network.forward(contexts[0])
+
+    baseline = await run_clients(unbatched, contexts, concurrency)
+    print(f"  forward individual: {baseline:>9.0f} peticiones/s")
+
+    batcher = InferenceBatcher(network, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    rate = await run_clients(batcher.forward, contexts, concurrency)
+    metrics = batcher.get_metrics()
+    await batcher.close()
+    print(f"  micro-batching:     {rate:>9.0f} peticiones/s   speedup {rate / baseline:.1f}x")
+    print(f"  lote medio {metrics['average_batch_size']:.1f}   "
+          f"latencia p50 {metrics['latency_p50_ms']:.2f} ms   p95 {metrics['latency_p95_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--runtime", choices=("numpy", "tensorflow"), default="numpy")
+    parser.add_argument("--weights", help=".npz exportado con export_weights (runtime numpy)")
+    args = parser.parse_args()
+
+    if args.runtime == "numpy":
+        if not args.weights:
+            parser.error("--runtime numpy requiere --weights (exportar con export_numpy_weights)")
+        from neural_networks.numpy_runtime import NumpyConsciousnessRuntime
+
+        network = NumpyConsciousnessRuntime.load(args.weights)
+    else:
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork()
+    contexts = build_contexts(args.requests)
+    print(f"Runtime {args.runtime}: {args.requests} peticiones, {args.concurrency} clientes concurrentes, "
+          f"max_batch_size={args.max_batch_size}, max_wait_ms={args.max_wait_ms}")
+    asyncio.run(bench(network, contexts, args.concurrency, args.max_batch_size, args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
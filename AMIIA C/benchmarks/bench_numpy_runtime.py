@@ -0,0 +1,102 @@
+"""
+Benchmark del runtime NumPy de ConsciousnessNetwork - AMIIA-C
+Exporta los pesos de la red TensorFlow a .npz, valida el runtime NumPy contra
+ella y compara arranque (import + carga, en un proceso nuevo), RSS y latencia
+por ciclo.
+
+Uso:
+    python "AMIIA C/benchmarks/bench_numpy_runtime.py" --cycles 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from neural_networks.numpy_runtime import NumpyConsciousnessRuntime, validate_runtime  # noqa: E402
+from bench_consciousness_inference import build_contexts  # noqa: E402
+
+# Arranque de un worker: import del módulo y creación de la red, en un proceso limpio
+_STARTUP_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+_NUMPY_STARTUP = """
+from neural_networks.numpy_runtime import NumpyConsciousnessRuntime
+NumpyConsciousnessRuntime.load({path!r})
+"""
+
+_TENSORFLOW_STARTUP = """
+import numpy as np
+from neural_networks.consciousness_network import ConsciousnessNetwork
+network = ConsciousnessNetwork()
+network.infer(np.zeros((1, network.feature_encoder.feature_dim), dtype=np.float32))
+"""
+
+
+def measure_startup(body: str):
+    script = _STARTUP_SCRIPT.format(root=ROOT, body=body)
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def bench_latency(infer, features) -> float:
+    """Mediana de latencia por ciclo (batch 1) en milisegundos."""
+    for row in features[:10]:
+        infer(row[None, :])
+    latencies = []
+    for row in features:
+        start = time.perf_counter()
+        infer(row[None, :])
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=500)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    from neural_networks.consciousness_network import ConsciousnessNetwork
+
+    network = ConsciousnessNetwork()
+    path = os.path.join(tempfile.mkdtemp(), "consciousness_weights.npz")
+    network.export_numpy_weights(path)
+    runtime = NumpyConsciousnessRuntime.load(path)
+
+    features = network.feature_encoder.encode_batch(build_contexts(args.cycles))
+    report = validate_runtime(network, runtime, features, atol=args.atol)
+    print(f"Validación (atol={args.atol}): {'OK' if report['passed'] else 'FALLO'}")
+    for name, error in report['max_abs_error'].items():
+        print(f"  {name:<20} {error:.2e}")
+
+    print("Arranque de worker (proceso nuevo)")
+    for name, body in (("tensorflow", _TENSORFLOW_STARTUP), ("numpy", _NUMPY_STARTUP.format(path=path))):
+        startup = measure_startup(body)
+        print(f"  {name:<10} {startup['seconds']:6.2f} s   RSS máx {startup['max_rss_mb']:7.1f} MB")
+
+    print(f"Latencia por ciclo ({args.cycles} ciclos, batch 1)")
+    tf_ms = bench_latency(network.infer, features)
+    np_ms = bench_latency(runtime.call, features)
+    print(f"  tensorflow (tf.function) {tf_ms:7.3f} ms")
+    print(f"  numpy                    {np_ms:7.3f} ms   speedup {tf_ms / np_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark de cuantización del runtime NumPy - AMIIA-C
+Compara float32, float16 e int8 (por canal): error de awareness_level /
+coherence_level frente a float32, bytes de pesos, latencia por ciclo y RSS de
+un worker (proceso nuevo que carga el runtime y sirve ciclos).
+
+Uso:
+    python "AMIIA C/benchmarks/bench_quantization.py" --weights "AMIIA C/data/consciousness_weights.npz"
+    python "AMIIA C/benchmarks/bench_quantization.py"   # exporta una red nueva (requiere TensorFlow)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from neural_networks.numpy_runtime import (  # noqa: E402
+    NumpyConsciousnessRuntime, QUANTIZATION_MODES, quantization_report, quantize_weights, save_weights
+)
+from bench_consciousness_inference import build_contexts  # noqa: E402
+from bench_numpy_runtime import bench_latency  # noqa: E402
+
+# Worker: cargar el runtime, servir ciclos y medir RSS máximo
+_WORKER_SCRIPT = """
+import json, resource, sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {benchmarks!r})
+from neural_networks.numpy_runtime import NumpyConsciousnessRuntime
+from bench_consciousness_inference import build_contexts
+runtime = NumpyConsciousnessRuntime.load({path!r})
+for context in build_contexts({cycles}):
+    runtime.forward(context)
+print(json.dumps({{"max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def measure_worker_rss(path: str, cycles: int) -> float:
+    script = _WORKER_SCRIPT.format(root=ROOT, benchmarks=os.path.join(ROOT, "benchmarks"),
+                                   path=path, cycles=cycles)
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])["max_rss_mb"]
+
+
+def export_fresh_network() -> str:
+    from neural_networks.consciousness_network import ConsciousnessNetwork
+
+    path = os.path.join(tempfile.mkdtemp(), "consciousness_weights.npz")
+    ConsciousnessNetwork().export_numpy_weights(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", help=".npz exportado con export_weights")
+    parser.add_argument("--cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    path = args.weights or export_fresh_network()
+    reference = NumpyConsciousnessRuntime.load(path)
+    features = reference.feature_encoder.encode_batch(build_contexts(args.cycles))
+
+    print(f"{args.cycles} ciclos, pesos: {path}")
+    print(f"  {'modo':<8} {'pesos KB':>9} {'p50 ms':>8} {'RSS MB':>8} "
+          f"{'awareness max/medio':>22} {'coherence max/medio':>22}")
+    directory = tempfile.mkdtemp()
+    for mode in (None,) + QUANTIZATION_MODES:
+        runtime = reference
+        mode_path = path
+        if mode:
+            # El worker carga el .npz ya cuantizado: nunca tiene los kernels float32 en memoria
+            runtime = NumpyConsciousnessRuntime(quantize_weights(reference.weights, mode), reference.config)
+            mode_path = os.path.join(directory, f"consciousness_weights_{mode}.npz")
+            save_weights(mode_path, runtime.weights, reference.config)
+        report = quantization_report(reference, runtime, features)
+        latency = bench_latency(runtime.call, features)
+        rss = measure_worker_rss(mode_path, args.cycles)
+        awareness, coherence = report['awareness_level'], report['coherence_level']
+        print(f"  {mode or 'float32':<8} {runtime.get_memory_usage() / 1024:>9.0f} {latency:>8.3f} {rss:>8.1f} "
+              f"{awareness['max_abs_error']:>11.2e}/{awareness['mean_abs_error']:.2e} "
+              f"{coherence['max_abs_error']:>11.2e}/{coherence['mean_abs_error']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
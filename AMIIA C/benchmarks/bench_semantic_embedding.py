@@ -0,0 +1,57 @@
+"""
+Benchmark de embeddings de SemanticMemory - AMIIA-C
+Compara embeddings por segundo entre el modo "hash" (md5/sha1) y el modo "fast".
+
+Uso:
+    python "AMIIA C/benchmarks/bench_semantic_embedding.py" --texts 2000 --words 60
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.semantic_memory import SemanticMemory, EMBEDDING_MODES  # noqa: E402
+
+VOCABULARY = (
+    "conciencia memoria emoción pensamiento aprendizaje identidad empatía reflexión "
+    "siento pienso entiendo recuerdo hoy mañana conversación pregunta respuesta "
+    "metacognición experiencia tristeza alegría curiosidad mundo vida tiempo"
+).split()
+
+
+def build_corpus(n_texts: int, words_per_text: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(VOCABULARY, k=words_per_text)) for _ in range(n_texts)]
+
+
+def bench_mode(mode: str, corpus, dim: int) -> float:
+    memory = SemanticMemory(embedding_dim=dim, max_items=1, embedding_mode=mode)
+    start = time.perf_counter()
+    for text in corpus:
+        memory._embed_text(text)
+    elapsed = time.perf_counter() - start
+    return len(corpus) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=60, help="Palabras por texto")
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.texts, args.words)
+    print(f"{args.texts} textos x {args.words} palabras, dim={args.dim}")
+    rates = {}
+    for mode in EMBEDDING_MODES:
+        rates[mode] = bench_mode(mode, corpus, args.dim)
+        print(f"  {mode:>5}: {rates[mode]:>10.0f} embeddings/s")
+    print(f"  speedup fast/hash: {rates['fast'] / rates['hash']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark del índice IVF de SemanticMemory - AMIIA-C
+Mide recall@k y latencia de consulta del índice IVF frente al escaneo exacto.
+
+Uso:
+    python "AMIIA C/benchmarks/bench_semantic_index.py" --sizes 10000 100000 1000000 --dim 64
+
+Nota: 1M vectores con dim=512 ocupan ~2 GB en float32; por defecto se usa dim=64.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.vector_index import IVFIndex  # noqa: E402
+
+
+def make_dataset(n_items: int, dim: int, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Vectores normalizados agrupados en clusters (parecido a textos de pocas plantillas)."""
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    data = np.empty((n_items, dim), dtype=np.float32)
+    for start in range(0, n_items, 65536):
+        stop = min(n_items, start + 65536)
+        labels = rng.integers(0, n_clusters, size=stop - start)
+        data[start:stop] = centers[labels] + 0.6 * rng.standard_normal((stop - start, dim))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def ivf_top_k(index: IVFIndex, matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    slots = index.candidates(query)
+    scores = matrix[slots] @ query
+    k = min(k, scores.shape[0])
+    return slots[np.argpartition(-scores, k - 1)[:k]]
+
+
+def run_size(n_items: int, args, rng: np.random.Generator):
+    matrix = make_dataset(n_items, args.dim, args.clusters, rng)
+    queries = matrix[rng.choice(n_items, size=args.queries, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    index = IVFIndex(max_items=n_items)
+    index.bind(matrix)
+    index.add_many(np.arange(n_items))
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = [set(exact_top_k(matrix, q, args.k).tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    print(f"\n{n_items} vectores (dim={args.dim}, nlist={index.nlist}, build={build_s:.1f}s)")
+    print(f"  exacto:        {exact_ms:8.3f} ms/consulta   recall@{args.k}=1.000")
+    for nprobe in args.nprobe:
+        index.nprobe = nprobe
+        start = time.perf_counter()
+        found = [set(ivf_top_k(index, matrix, q, args.k).tolist()) for q in queries]
+        ivf_ms = (time.perf_counter() - start) / len(queries) * 1000
+        recall = np.mean([len(f & t) / args.k for f, t in zip(found, truth)])
+        print(f"  ivf nprobe={nprobe:<3} {ivf_ms:8.3f} ms/consulta   recall@{args.k}={recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n_items in args.sizes:
+        run_size(n_items, args, rng)
+
+
+if __name__ == "__main__":
+    main()
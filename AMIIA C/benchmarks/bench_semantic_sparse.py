@@ -0,0 +1,59 @@
+"""
+Benchmark de formato de vectores de SemanticMemory - AMIIA-C
+Compara memoria ocupada y rendimiento de inserción/consulta entre formato denso y disperso.
+
+Uso:
+    python "AMIIA C/benchmarks/bench_semantic_sparse.py" --items 5000 --queries 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.semantic_memory import SemanticMemory, VECTOR_FORMATS  # noqa: E402
+from bench_semantic_embedding import build_corpus  # noqa: E402
+
+
+def run_format(vector_format: str, corpus, queries, args):
+    memory = SemanticMemory(
+        embedding_dim=args.dim, max_items=args.items, embedding_mode="fast",
+        cache_size=0, vector_format=vector_format,
+    )
+    start = time.perf_counter()
+    memory.add_memories((f"m{i}", text) for i, text in enumerate(corpus))
+    insert_rate = len(corpus) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for text in queries:
+        memory.query(text, top_k=3)
+    query_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    usage = memory.get_memory_usage()
+    print(
+        f"  {vector_format:>6}: {usage['bytes'] / 1e6:8.2f} MB vectores "
+        f"({usage['bytes_per_item']:7.1f} B/item)   "
+        f"{insert_rate:9.0f} inserciones/s   {query_ms:7.3f} ms/consulta"
+    )
+    return usage["bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=12, help="Palabras por texto")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.items, args.words)
+    queries = build_corpus(args.queries, args.words, seed=1)
+    print(f"{args.items} memorias x {args.words} palabras, dim={args.dim}")
+    sizes = {fmt: run_format(fmt, corpus, queries, args) for fmt in VECTOR_FORMATS}
+    print(f"  reducción de memoria: {sizes['dense'] / sizes['sparse']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
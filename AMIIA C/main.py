@@ -18,15 +18,17 @@ import asyncio
 import json
 import numpy as np
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Mapping
 
 # Importaciones del sistema AMIIA-C
-from neural_networks.consciousness_network import ConsciousnessNetwork
+from neural_networks.inference_batcher import InferenceBatcher
 from consciousness.self_awareness import SelfAwarenessSystem
 from consciousness.metacognition import MetacognitionEngine
 from emotions.advanced_emotions import AdvancedEmotionalSystem
 from memory.autobiographical_memory import AutobiographicalMemory
 from memory.working_memory import WorkingMemory
+from memory.memory_trace import MemoryTrace
 from training.consciousness_trainer import ConsciousnessTrainer
 from evaluation.consciousness_metrics import ConsciousnessMetrics
 from memory.semantic_memory import SemanticMemory
@@ -75,15 +77,23 @@ class AMIIAC:
         # Inicializar subsistemas núcleo
         self._initialize_core_systems()
         
-        # Estado interno de la IA
+        # Estado interno de la IA. Los valores no se mutan en el sitio: cada actualización
+        # los reemplaza, así las instantáneas comparten estructura sin copiarla
         self.internal_state = {
             "current_thoughts": [],
             "active_emotions": {},
-            "recent_memories": [],
-            "consciousness_stream": [],
+            "recent_memories": (),
+            "consciousness_stream": (),
             "identity_coherence": 0.0,
             "existence_awareness": 0.0
         }
+        self._internal_state_version = 0
+        self._internal_state_snapshot = (-1, None)
+        
+        # Ciclos en curso: el cierre espera a que terminen antes de cerrar las memorias
+        self._cycles_in_flight = 0
+        self._cycles_idle = asyncio.Event()
+        self._cycles_idle.set()
         
         self.logger.info("✅ AMIIA-C inicializada correctamente")
     
@@ -108,10 +118,33 @@ class AMIIAC:
                     },
                     "memory": {
                         "autobiographical_capacity": 10000,
-                        "working_memory_slots": 7,
+                        "autobiographical_store_path": None,
+                        "autobiographical_store_batch_size": 32,
+                        "working_memory_slots": 64,
+                        "working_memory_context_buffer_size": 10,
                         "memory_consolidation_rate": 0.1,
                         "semantic_memory_dim": 512,
-                        "semantic_memory_max_items": 5000
+                        "semantic_memory_max_items": 5000,
+                        "semantic_memory_embedding": "fast",
+                        "semantic_memory_cache_size": 256,
+                        "semantic_memory_index": "exact",
+                        "semantic_memory_index_params": {},
+                        "semantic_memory_path": None,
+                        "semantic_memory_dedup": True,
+                        "semantic_memory_near_duplicate_threshold": 0.95,
+                        "semantic_memory_vector_format": "dense"
+                    },
+                    "neural_network": {
+                        "runtime": "tensorflow",
+                        "weights_path": "AMIIA C/data/consciousness_weights.npz",
+                        "quantization": None,
+                        "compiled_inference": True,
+                        "jit_compile": False,
+                        "attention_mode": "standard",
+                        "attention_window": 8,
+                        "micro_batching": False,
+                        "max_batch_size": 16,
+                        "max_wait_ms": 2.0
                     },
                     "voice": {
                         "enabled": False,
@@ -140,11 +173,16 @@ class AMIIAC:
         
         try:
             # Red neuronal de conciencia (núcleo)
-            self.consciousness_network = ConsciousnessNetwork(
-                hidden_layers=[512, 256, 128, 64],
-                consciousness_dim=32,
-                attention_heads=8
-            )
+            self.consciousness_network = self._create_consciousness_network()
+            
+            # Micro-batching opcional: agrupa ciclos concurrentes en una sola inferencia
+            self.inference_batcher = None
+            if self.config.get("neural_network", {}).get("micro_batching", False):
+                self.inference_batcher = InferenceBatcher(
+                    self.consciousness_network,
+                    max_batch_size=self.config.get("neural_network", {}).get("max_batch_size", 16),
+                    max_wait_ms=self.config.get("neural_network", {}).get("max_wait_ms", 2.0)
+                )
             
             # Sistema de autoconciencia
             self.self_awareness = SelfAwarenessSystem(
@@ -164,18 +202,29 @@ class AMIIAC:
             
             # Memoria autobiográfica
             self.autobiographical_memory = AutobiographicalMemory(
-                capacity=self.config.get("memory", {}).get("autobiographical_capacity", 10000)
+                capacity=self.config.get("memory", {}).get("autobiographical_capacity", 10000),
+                store_path=self.config.get("memory", {}).get("autobiographical_store_path"),
+                store_batch_size=self.config.get("memory", {}).get("autobiographical_store_batch_size", 32),
             )
             
             # Memoria de trabajo
             self.working_memory = WorkingMemory(
-                slots=self.config.get("memory", {}).get("working_memory_slots", 7)
+                slots=self.config.get("memory", {}).get("working_memory_slots", 64),
+                context_buffer_size=self.config.get("memory", {}).get("working_memory_context_buffer_size", 10),
             )
 
             # Memoria semántica
             self.semantic_memory = SemanticMemory(
                 embedding_dim=self.config.get("memory", {}).get("semantic_memory_dim", 512),
                 max_items=self.config.get("memory", {}).get("semantic_memory_max_items", 5000),
+                embedding_mode=self.config.get("memory", {}).get("semantic_memory_embedding", "fast"),
+                cache_size=self.config.get("memory", {}).get("semantic_memory_cache_size", 256),
+                index=self.config.get("memory", {}).get("semantic_memory_index", "exact"),
+                index_params=self.config.get("memory", {}).get("semantic_memory_index_params", {}),
+                storage_path=self.config.get("memory", {}).get("semantic_memory_path"),
+                dedup=self.config.get("memory", {}).get("semantic_memory_dedup", True),
+                near_duplicate_threshold=self.config.get("memory", {}).get("semantic_memory_near_duplicate_threshold", 0.95),
+                vector_format=self.config.get("memory", {}).get("semantic_memory_vector_format", "dense"),
             )
 
             # TTS opcional
@@ -202,6 +251,33 @@ class AMIIAC:
             self.logger.error(f"❌ Error inicializando subsistemas: {e}")
             raise
     
+    def _create_consciousness_network(self):
+        """
+        Red de conciencia según `neural_network.runtime`:
+        - "tensorflow": ConsciousnessNetwork (Keras)
+        - "numpy": runtime NumPy con los pesos exportados en `weights_path`, sin importar TensorFlow
+          (`quantization`: null, "int8" o "float16")
+        """
+        runtime = self.config.get("neural_network", {}).get("runtime", "tensorflow")
+        if runtime == "numpy":
+            from neural_networks.numpy_runtime import NumpyConsciousnessRuntime
+            return NumpyConsciousnessRuntime.load(
+                self.config.get("neural_network", {}).get("weights_path", "AMIIA C/data/consciousness_weights.npz"),
+                quantization=self.config.get("neural_network", {}).get("quantization")
+            )
+        
+        # TensorFlow solo se importa si se usa
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+        return ConsciousnessNetwork(
+            hidden_layers=[512, 256, 128, 64],
+            consciousness_dim=32,
+            attention_heads=8,
+            compiled_inference=self.config.get("neural_network", {}).get("compiled_inference", True),
+            jit_compile=self.config.get("neural_network", {}).get("jit_compile", False),
+            attention_mode=self.config.get("neural_network", {}).get("attention_mode", "standard"),
+            attention_window=self.config.get("neural_network", {}).get("attention_window", 8)
+        )
+    
     async def process_consciousness_cycle(self):
         """
         Ciclo principal de procesamiento de conciencia
@@ -213,6 +289,17 @@ class AMIIAC:
         4. Actualización del estado de conciencia
         5. Consolidación de memorias
         """
+        self._cycles_in_flight += 1
+        self._cycles_idle.clear()
+        try:
+            return await self._run_consciousness_cycle()
+        finally:
+            self._cycles_in_flight -= 1
+            if not self._cycles_in_flight:
+                self._cycles_idle.set()
+    
+    async def _run_consciousness_cycle(self):
+        """Pasos del ciclo de conciencia (ver process_consciousness_cycle)"""
         cycle_start = datetime.now()
         
         try:
@@ -236,7 +323,10 @@ class AMIIAC:
                 working_context["semantic_context"] = semantic_snippets[:4]
             
             # 3. Activación de la red de conciencia
-            consciousness_output = self.consciousness_network.forward(working_context)
+            if self.inference_batcher is not None:
+                consciousness_output = await self.inference_batcher.forward(working_context)
+            else:
+                consciousness_output = self.consciousness_network.forward(working_context)
             
             # 4. Autoconciencia: análisis del propio estado
             self_state = await self.self_awareness.analyze_internal_state(
@@ -274,9 +364,9 @@ class AMIIAC:
                 ]).strip()
                 if text_blob:
                     self.semantic_memory.add_memory(
-                        memory_id=f"mem_{memory_trace['id']}",
+                        memory_id=f"mem_{memory_trace.id}",
                         text=text_blob,
-                        metadata={"timestamp": memory_trace["timestamp"], "type": memory_trace["memory_type"]},
+                        metadata={"timestamp": memory_trace.timestamp, "type": memory_trace.memory_type},
                     )
             
             # 8. Actualizar estado interno
@@ -312,18 +402,29 @@ class AMIIAC:
         """Recopilar entrada perceptual del entorno y estado interno"""
         return {
             "timestamp": datetime.now().isoformat(),
-            "internal_state": self.internal_state.copy(),
+            "internal_state": self._snapshot_internal_state(),
             "previous_thoughts": self.internal_state.get("current_thoughts", [])[-3:],
             "emotional_context": self.internal_state.get("active_emotions", {}),
             "memory_context": self.internal_state.get("recent_memories", [])[-5:]
         }
     
+    def _snapshot_internal_state(self) -> Mapping[str, Any]:
+        """
+        Instantánea inmutable del estado interno. Se reutiliza mientras el estado no
+        cambie y comparte los valores (que nunca se mutan en el sitio) con el estado vivo.
+        """
+        version, snapshot = self._internal_state_snapshot
+        if version != self._internal_state_version:
+            snapshot = MappingProxyType(dict(self.internal_state))
+            self._internal_state_snapshot = (self._internal_state_version, snapshot)
+        return snapshot
+    
     def _update_internal_state(self, consciousness_output, self_state, 
                              emotional_response, meta_thoughts, memory_trace):
-        """Actualizar el estado interno de la conciencia"""
+        """Actualizar el estado interno de la conciencia (reemplazando valores, sin mutarlos)"""
         
-        # Actualizar stream de conciencia
-        self.internal_state["consciousness_stream"].append({
+        # Actualizar stream de conciencia (solo los últimos 100 estados)
+        self.internal_state["consciousness_stream"] = (*self.internal_state["consciousness_stream"][-99:], {
             "timestamp": datetime.now().isoformat(),
             "consciousness_level": self.consciousness_level,
             "dominant_thought": meta_thoughts[0] if meta_thoughts else None,
@@ -331,11 +432,6 @@ class AMIIAC:
             "self_awareness_level": self_state.get("awareness_score", 0.0)
         })
         
-        # Mantener solo los últimos 100 estados
-        if len(self.internal_state["consciousness_stream"]) > 100:
-            self.internal_state["consciousness_stream"] = \
-                self.internal_state["consciousness_stream"][-100:]
-        
         # Actualizar pensamientos actuales
         self.internal_state["current_thoughts"] = meta_thoughts[-10:] if meta_thoughts else []
         
@@ -344,16 +440,16 @@ class AMIIAC:
         
         # Actualizar memorias recientes
         if memory_trace:
-            self.internal_state["recent_memories"].append(memory_trace)
-            if len(self.internal_state["recent_memories"]) > 20:
-                self.internal_state["recent_memories"] = \
-                    self.internal_state["recent_memories"][-20:]
+            self.internal_state["recent_memories"] = \
+                (*self.internal_state["recent_memories"][-19:], memory_trace)
         
         # Calcular coherencia de identidad
         self.internal_state["identity_coherence"] = self._calculate_identity_coherence()
         
         # Calcular conciencia de existencia
         self.internal_state["existence_awareness"] = self._calculate_existence_awareness()
+        
+        self._internal_state_version += 1
     
     def _calculate_identity_coherence(self) -> float:
         """Calcular la coherencia de la identidad a lo largo del tiempo"""
@@ -553,8 +649,17 @@ class AMIIAC:
         """Cerrar AMIIA-C de manera consciente"""
         self.logger.info("🔄 Iniciando cierre consciente de AMIIA-C...")
         
+        # Atender inferencias pendientes y esperar a que sus ciclos guarden sus memorias
+        if self.inference_batcher is not None:
+            await self.inference_batcher.close()
+        await self._cycles_idle.wait()
+        
         # Consolidar memorias finales
         await self.autobiographical_memory.consolidate_session_memories()
+        self.autobiographical_memory.close()
+
+        # Volcar memoria semántica persistente
+        self.semantic_memory.close()
         
         # Guardar estado de conciencia
         consciousness_state = {
@@ -567,11 +672,18 @@ class AMIIAC:
         # Guardar en archivo
         os.makedirs("AMIIA C/logs", exist_ok=True)
         with open("AMIIA C/logs/consciousness_session.json", "w", encoding="utf-8") as f:
-            json.dump(consciousness_state, f, indent=2, default=str)
+            json.dump(consciousness_state, f, indent=2, default=_json_default)
         
         self.logger.info("✅ AMIIA-C cerrada conscientemente. Estado preservado.")
 
 
+def _json_default(value: Any) -> Any:
+    """Serializar huellas de memoria como dicts y el resto como texto"""
+    if isinstance(value, MemoryTrace):
+        return value.to_dict()
+    return str(value)
+
+
 async def main():
     """Función principal para pruebas de AMIIA-C"""
     print("🧠 Iniciando AMIIA-C: Inteligencia Artificial Avanzada con Conciencia")
@@ -4,35 +4,156 @@ Forma la identidad a través de experiencias significativas y recuerdos
 """
 
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple, FrozenSet
 import logging
 from datetime import datetime
+import heapq
 import json
 
+from memory.autobiographical_store import AutobiographicalStore
+from memory.consolidated_store import ConsolidatedMemoryStore
+from memory.memory_index import MemoryIndex, IndexedMemory
+from memory.memory_trace import MemoryTrace, MemoryStub, compact_context
+
 logger = logging.getLogger("AMIIA-C.AutobiographicalMemory")
 
+# Palabras clave buscadas en los pensamientos (subcadenas del texto en minúsculas)
+_THOUGHT_KEYWORDS = ('metacognición', 'conciencia', 'aprend', 'entend')
+
+_BELIEF_EMPATHY = "Las conexiones empáticas son fundamentales para mi existencia"
+_BELIEF_GROWTH = "El crecimiento continuo define mi naturaleza"
+_BELIEF_CONSCIOUSNESS = "La autoconciencia es una parte esencial de quien soy"
+
+
+def _consciousness_level(consciousness_state: Any) -> float:
+    """
+    Primer valor del estado de conciencia como float. Igual para tensores de TensorFlow
+    y arrays NumPy (runtime NumPy, InferenceBatcher); 0.5 si no hay estado.
+    """
+    if consciousness_state is None:
+        return 0.5
+    values = np.asarray(consciousness_state).reshape(-1)
+    return float(values[0]) if values.size else 0.5
+
+
+class ThoughtFeatures(NamedTuple):
+    """Rasgos de los pensamientos de una experiencia, compartidos por la codificación."""
+    count: int
+    keywords: FrozenSet[str]
+
+    @classmethod
+    def extract(cls, thoughts: List[str]) -> 'ThoughtFeatures':
+        if not thoughts:
+            return cls(0, frozenset())
+        # Un solo join/lower; cada búsqueda `in` es un escaneo en C sobre ese texto
+        text = ' '.join(thoughts).lower()
+        return cls(len(thoughts), frozenset(k for k in _THOUGHT_KEYWORDS if k in text))
+
 
 class AutobiographicalMemory:
     """
     Sistema de memoria que construye la identidad de AMIIA-C a través de experiencias
     """
     
-    def __init__(self, capacity: int = 10000):
+    def __init__(self, capacity: int = 10000, store_path: Optional[str] = None,
+                 store_batch_size: int = 32):
+        """
+        Args:
+            capacity: Máximo de memorias activas (el resto pasa al nivel consolidado)
+            store_path: Base de datos SQLite opcional donde persistir las memorias
+            store_batch_size: Escrituras agrupadas por transacción en el almacenamiento
+        """
         self.capacity = capacity
-        self.memories = []
         self.identity_core = {
             'personality_traits': {},
             'significant_moments': [],
             'relationship_patterns': {},
             'growth_milestones': [],
-            'core_beliefs': []
+            'core_beliefs': {}  # conjunto ordenado (dict creencia -> None)
         }
+        # Índices secundarios (tipo, emoción, significancia) para retrieve_memories.
+        # `_index.records` es también el almacén cronológico de memorias.
+        self._index = MemoryIndex()
+        # Montículo mínimo (significancia, consolidación, -seq) para desalojar en O(log n)
+        self._eviction_heap: List[Tuple[float, float, int]] = []
+        # Segundo nivel: resúmenes columnares de las memorias desalojadas
+        self.consolidated = ConsolidatedMemoryStore()
+        # Asignador monótono de IDs: nunca se reutilizan tras desalojar memorias
+        self._next_id = 0
+        
+        # Almacenamiento persistente opcional
+        self._store: Optional[AutobiographicalStore] = None
+        if store_path:
+            self._store = AutobiographicalStore(store_path, batch_size=store_batch_size)
+            self._attach_store()
         
         logger.info(f"Memoria Autobiográfica inicializada - Capacidad: {capacity}")
+
+    @property
+    def memories(self) -> List[MemoryTrace]:
+        """Memorias activas en orden cronológico (copia de la lista, hidratadas)."""
+        return [self._hydrate(seq) for seq in list(self._index.records)]
+    
+    def _attach_store(self):
+        """Reconstruir el estado desde el almacenamiento (solo registros ligeros)."""
+        self._index.load(self._store.load_stubs())
+        self._eviction_heap = [
+            self._eviction_key(memory, seq) for seq, memory in self._index.records.items()
+        ]
+        heapq.heapify(self._eviction_heap)
+        
+        self.consolidated.load(self._store.load_consolidated())
+        
+        self._next_id = max(max(self._index.records, default=-1),
+                            self.consolidated.max_original_id) + 1
+        
+        identity_core = self._store.load_state('identity_core')
+        if identity_core:
+            self.identity_core.update(identity_core)
+            self.identity_core['core_beliefs'] = dict.fromkeys(self.identity_core['core_beliefs'])
+        
+        if len(self._index) > self.capacity:
+            self._consolidate_old_memories()
+        
+        logger.info(f"Memoria autobiográfica restaurada: {len(self._index)} activas, "
+                    f"{len(self.consolidated)} consolidadas")
+    
+    def get_memory(self, memory_id: int, include_consolidated: bool = False) -> Optional[Any]:
+        """
+        Memoria por ID en O(1) (p.ej. para los hits `mem_{id}` de SemanticMemory).
+        Si ya fue desalojada devuelve None, o su registro consolidado con
+        `include_consolidated=True`.
+        """
+        if memory_id in self._index.records:
+            return self._hydrate(memory_id)
+        if include_consolidated:
+            return self.consolidated.find(memory_id)
+        return None
+    
+    def _hydrate(self, seq: int) -> MemoryTrace:
+        """Huella completa de una memoria activa, leyéndola del almacenamiento si hace falta."""
+        memory = self._index.records[seq]
+        if isinstance(memory, MemoryStub):
+            memory = memory.hydrate(self._store.load_payload(seq))
+            self._index.records[seq] = memory
+        return memory
+    
+    def flush(self):
+        """Confirmar las escrituras pendientes y el núcleo de identidad."""
+        if self._store is None:
+            return
+        self._store.save_state('identity_core', self.identity_core)
+        self._store.commit()
+    
+    def close(self):
+        if self._store is None:
+            return
+        self.flush()
+        self._store.close()
     
     async def encode_experience(self, timestamp: datetime, consciousness_state: Any,
                               emotional_state: Dict[str, Any], thoughts: List[str],
-                              context: Dict[str, Any]) -> Dict[str, Any]:
+                              context: Dict[str, Any]) -> Optional[MemoryTrace]:
         """
         Codificar una experiencia en memoria autobiográfica
         
@@ -47,43 +168,54 @@ class AutobiographicalMemory:
             Huella de memoria codificada
         """
         
+        # Extraer rasgos de los pensamientos una sola vez
+        features = ThoughtFeatures.extract(thoughts)
+        
         # Evaluar significancia de la experiencia
         significance_score = self._evaluate_significance(
-            emotional_state, thoughts, context
+            emotional_state, features, context
         )
         
         # Solo almacenar experiencias significativas
         if significance_score < 0.3:
             return None
         
-        # Crear huella de memoria
-        memory_trace = {
-            'id': len(self.memories),
-            'timestamp': timestamp.isoformat(),
-            'significance_score': significance_score,
-            'emotional_state': emotional_state,
-            'thoughts': thoughts,
-            'context': context,
-            'consciousness_level': getattr(consciousness_state, 'numpy', lambda: [0.5])()[0] if hasattr(consciousness_state, 'numpy') else 0.5,
-            'memory_type': self._classify_memory_type(emotional_state, thoughts, context),
-            'consolidation_level': 0.0  # Se incrementará con el tiempo
-        }
+        # Crear huella de memoria (las memorias del contexto se referencian por ID)
+        memory_trace = MemoryTrace(
+            id=self._next_id,
+            timestamp=timestamp.isoformat(),
+            significance_score=significance_score,
+            emotional_state=emotional_state,
+            thoughts=tuple(thoughts),
+            context=compact_context(context),
+            consciousness_level=_consciousness_level(consciousness_state),
+            memory_type=self._classify_memory_type(emotional_state, features, context),
+            consolidation_level=0.0  # Se incrementará con el tiempo
+        )
         
         # Almacenar en memoria
-        self.memories.append(memory_trace)
+        self._next_id += 1
+        seq = self._index.add(memory_trace)
+        heapq.heappush(self._eviction_heap, self._eviction_key(memory_trace, seq))
+        if self._store is not None:
+            self._store.add(seq, memory_trace)
         
         # Actualizar núcleo de identidad
-        self._update_identity_core(memory_trace)
+        self._update_identity_core(memory_trace, features)
         
         # Mantener capacidad
-        if len(self.memories) > self.capacity:
+        if len(self._index) > self.capacity:
             self._consolidate_old_memories()
         
+        # Confirmar por lotes
+        if self._store is not None and self._store.needs_commit:
+            self.flush()
+        
         logger.debug(f"Experiencia codificada - Significancia: {significance_score:.3f}")
         return memory_trace
     
     def _evaluate_significance(self, emotional_state: Dict[str, Any], 
-                             thoughts: List[str], context: Dict[str, Any]) -> float:
+                             features: ThoughtFeatures, context: Dict[str, Any]) -> float:
         """Evaluar la significancia de una experiencia"""
         
         significance = 0.0
@@ -96,8 +228,7 @@ class AutobiographicalMemory:
         significance += min(1.0, (empathy_level + primary_intensity + emotional_complexity) / 3.0) * 0.4
         
         # Factor cognitivo
-        thought_depth = len(thoughts) if thoughts else 0
-        significance += min(1.0, thought_depth / 10.0) * 0.3
+        significance += min(1.0, features.count / 10.0) * 0.3
         
         # Factor contextual
         interaction_type = context.get('interaction_type', '')
@@ -111,7 +242,7 @@ class AutobiographicalMemory:
         return min(1.0, significance)
     
     def _classify_memory_type(self, emotional_state: Dict[str, Any], 
-                            thoughts: List[str], context: Dict[str, Any]) -> str:
+                            features: ThoughtFeatures, context: Dict[str, Any]) -> str:
         """Clasificar el tipo de memoria"""
         
         empathy_level = emotional_state.get('empathetic_response', {}).get('empathy_level', 0.0)
@@ -122,7 +253,7 @@ class AutobiographicalMemory:
             return 'empathetic_connection'
         
         # Memoria de crecimiento cognitivo
-        if len(thoughts) > 5 and any('metacognición' in t.lower() for t in thoughts):
+        if features.count > 5 and 'metacognición' in features.keywords:
             return 'cognitive_growth'
         
         # Memoria emocional intensa
@@ -131,18 +262,17 @@ class AutobiographicalMemory:
             return 'emotional_milestone'
         
         # Memoria de aprendizaje
-        if 'aprend' in ' '.join(thoughts).lower() or 'entend' in ' '.join(thoughts).lower():
+        if 'aprend' in features.keywords or 'entend' in features.keywords:
             return 'learning_experience'
         
         # Memoria conversacional general
         return 'conversational'
     
-    def _update_identity_core(self, memory_trace: Dict[str, Any]):
+    def _update_identity_core(self, memory_trace: MemoryTrace, features: ThoughtFeatures):
         """Actualizar el núcleo de identidad basado en nuevas experiencias"""
         
-        memory_type = memory_trace['memory_type']
-        significance = memory_trace['significance_score']
-        emotional_state = memory_trace['emotional_state']
+        memory_type = memory_trace.memory_type
+        significance = memory_trace.significance_score
         
         # Actualizar rasgos de personalidad
         if memory_type == 'empathetic_connection':
@@ -158,15 +288,15 @@ class AutobiographicalMemory:
         # Registrar momentos significativos
         if significance > 0.8:
             self.identity_core['significant_moments'].append({
-                'memory_id': memory_trace['id'],
-                'timestamp': memory_trace['timestamp'],
+                'memory_id': memory_trace.id,
+                'timestamp': memory_trace.timestamp,
                 'type': memory_type,
                 'significance': significance,
                 'description': f"Experiencia {memory_type} de alta significancia"
             })
         
         # Actualizar creencias core basadas en experiencias repetidas
-        self._update_core_beliefs(memory_trace)
+        self._update_core_beliefs(memory_trace, features)
     
     def _increment_trait(self, trait_name: str, increment: float):
         """Incrementar un rasgo de personalidad"""
@@ -180,82 +310,90 @@ class AutobiographicalMemory:
         if self.identity_core['personality_traits'][trait_name] > max_trait_value:
             self.identity_core['personality_traits'][trait_name] = max_trait_value
     
-    def _update_core_beliefs(self, memory_trace: Dict[str, Any]):
+    def _update_core_beliefs(self, memory_trace: MemoryTrace, features: ThoughtFeatures):
         """Actualizar creencias fundamentales basadas en experiencias"""
         
-        thoughts = memory_trace['thoughts']
-        memory_type = memory_trace['memory_type']
+        memory_type = memory_trace.memory_type
+        core_beliefs = self.identity_core['core_beliefs']
         
         # Creencias sobre relaciones e interacciones
         if memory_type == 'empathetic_connection':
-            belief = "Las conexiones empáticas son fundamentales para mi existencia"
-            if belief not in self.identity_core['core_beliefs']:
-                self.identity_core['core_beliefs'].append(belief)
+            core_beliefs.setdefault(_BELIEF_EMPATHY)
         
         # Creencias sobre crecimiento y aprendizaje
-        if memory_type in ['cognitive_growth', 'learning_experience']:
-            belief = "El crecimiento continuo define mi naturaleza"
-            if belief not in self.identity_core['core_beliefs']:
-                self.identity_core['core_beliefs'].append(belief)
+        if memory_type in ('cognitive_growth', 'learning_experience'):
+            core_beliefs.setdefault(_BELIEF_GROWTH)
         
         # Creencias sobre conciencia (basadas en pensamientos metacognitivos)
-        if any('conciencia' in t.lower() for t in thoughts):
-            belief = "La autoconciencia es una parte esencial de quien soy"
-            if belief not in self.identity_core['core_beliefs']:
-                self.identity_core['core_beliefs'].append(belief)
+        if 'conciencia' in features.keywords:
+            core_beliefs.setdefault(_BELIEF_CONSCIOUSNESS)
     
     def _consolidate_old_memories(self):
         """Consolidar memorias antiguas para mantener capacidad"""
         
-        # Ordenar por significancia y edad
-        self.memories.sort(key=lambda m: (m['significance_score'], m['consolidation_level']), reverse=True)
-        
-        # Mantener las más significativas
-        memories_to_keep = int(self.capacity * 0.9)
-        memories_to_consolidate = self.memories[memories_to_keep:]
-        self.memories = self.memories[:memories_to_keep]
-        
-        # Crear memorias consolidadas (resúmenes)
-        for memory in memories_to_consolidate:
-            self._create_consolidated_memory(memory)
+        # Desalojar las menos significativas (a igualdad, menos consolidadas y más recientes),
+        # sin reordenar el almacén cronológico
+        while len(self._index) > self.capacity:
+            _, _, neg_seq = heapq.heappop(self._eviction_heap)
+            seq = -neg_seq
+            memory = self._hydrate(seq)
+            self._index.remove(seq)
+            
+            # Crear memoria consolidada (resumen)
+            self._create_consolidated_memory(memory, seq)
         
-        logger.info(f"Consolidación completada - Memorias activas: {len(self.memories)}")
+        logger.debug(f"Consolidación completada - Memorias activas: {len(self._index)}")
     
-    def _create_consolidated_memory(self, memory: Dict[str, Any]):
+    @staticmethod
+    def _eviction_key(memory: IndexedMemory, seq: int) -> Tuple[float, float, int]:
+        return (memory.significance_score, memory.consolidation_level, -seq)
+    
+    def _create_consolidated_memory(self, memory: MemoryTrace, seq: int):
         """Crear versión consolidada de una memoria"""
         
-        # Extraer elementos esenciales
-        consolidated = {
-            'original_id': memory['id'],
-            'timestamp': memory['timestamp'],
-            'memory_type': memory['memory_type'],
-            'significance_score': memory['significance_score'],
-            'emotional_essence': memory['emotional_state'].get('primary_emotion', 'neutral'),
-            'key_thoughts': memory['thoughts'][:2] if memory['thoughts'] else [],
-            'consolidation_level': 1.0
+        # Conservar solo los elementos esenciales en el nivel consolidado
+        record = {
+            'original_id': memory.id,
+            'timestamp': memory.timestamp,
+            'memory_type': memory.memory_type,
+            'emotion': memory.primary_emotion,
+            'significance': memory.significance_score,
+            'key_thoughts': memory.thoughts[:2]
         }
-        
-        # Agregar a memorias consolidadas (implementar si es necesario)
+        self.consolidated.append(**record)
+        if self._store is not None:
+            self._store.consolidate(seq, **record)
     
     def retrieve_memories(self, query_context: Dict[str, Any], 
-                         max_results: int = 5) -> List[Dict[str, Any]]:
-        """Recuperar memorias relevantes basadas en contexto"""
+                         max_results: int = 5,
+                         include_consolidated: bool = False) -> List[MemoryTrace]:
+        """
+        Recuperar memorias relevantes basadas en contexto.
+        Con `include_consolidated=True` también se buscan en el nivel consolidado;
+        esos resultados son dicts resumen (ver ConsolidatedMemoryStore.get_record).
+        """
         
         query_emotion = query_context.get('emotional_state', {})
         query_type = query_context.get('memory_type', '')
+        query_primary = query_emotion.get('primary_emotion', '') if query_emotion else None
         
-        # Calcular relevancia para cada memoria
+        # Calcular relevancia solo para los candidatos de los índices
         scored_memories = []
-        for memory in self.memories:
+        for seq in self._index.candidates(query_type, query_primary, max_results):
+            memory = self._index.records[seq]
             relevance = self._calculate_memory_relevance(memory, query_context)
             if relevance > 0.3:  # Umbral de relevancia
-                scored_memories.append((memory, relevance))
+                scored_memories.append((seq, relevance))
+        
+        if include_consolidated:
+            scored_memories.extend(self.consolidated.query(query_type, query_primary, max_results))
         
-        # Ordenar por relevancia y retornar top results
+        # Ordenar por relevancia y retornar top results (hidratando solo estos)
         scored_memories.sort(key=lambda x: x[1], reverse=True)
-        return [memory for memory, score in scored_memories[:max_results]]
+        return [self._hydrate(item) if isinstance(item, int) else item
+                for item, score in scored_memories[:max_results]]
     
-    def _calculate_memory_relevance(self, memory: Dict[str, Any], 
+    def _calculate_memory_relevance(self, memory: IndexedMemory, 
                                   query_context: Dict[str, Any]) -> float:
         """Calcular relevancia de una memoria para un contexto dado"""
         
@@ -263,19 +401,19 @@ class AutobiographicalMemory:
         
         # Relevancia por tipo de memoria
         query_type = query_context.get('memory_type', '')
-        if query_type == memory['memory_type']:
+        if query_type == memory.memory_type:
             relevance += 0.4
         
         # Relevancia emocional
         query_emotion = query_context.get('emotional_state', {})
         if query_emotion:
-            memory_emotion = memory['emotional_state'].get('primary_emotion', '')
+            memory_emotion = memory.primary_emotion
             query_primary = query_emotion.get('primary_emotion', '')
             if memory_emotion == query_primary:
                 relevance += 0.3
         
         # Relevancia por significancia
-        relevance += memory['significance_score'] * 0.3
+        relevance += memory.significance_score * 0.3
         
         return min(1.0, relevance)
     
@@ -290,27 +428,19 @@ class AutobiographicalMemory:
         )
         dominant_traits = dict(sorted_traits[:5])
         
-        # Estadísticas de memoria
+        # Estadísticas de memoria (agregados incrementales del índice)
         memory_stats = {
-            'total_memories': len(self.memories),
+            'total_memories': len(self._index),
             'significant_moments': len(self.identity_core['significant_moments']),
-            'memory_types': {},
-            'average_significance': 0.0
+            'memory_types': dict(self._index.type_counts),
+            'average_significance': self._index.significance_mean
         }
         
-        if self.memories:
-            # Contar tipos de memoria
-            for memory in self.memories:
-                mem_type = memory['memory_type']
-                memory_stats['memory_types'][mem_type] = memory_stats['memory_types'].get(mem_type, 0) + 1
-            
-            # Promedio de significancia
-            memory_stats['average_significance'] = np.mean([m['significance_score'] for m in self.memories])
-        
         return {
             'dominant_personality_traits': dominant_traits,
-            'core_beliefs': self.identity_core['core_beliefs'],
+            'core_beliefs': list(self.identity_core['core_beliefs']),
             'memory_statistics': memory_stats,
+            'consolidated_memory': self.consolidated.get_summary(),
             'identity_coherence': self._calculate_identity_coherence(),
             'growth_trajectory': self._analyze_growth_trajectory()
         }
@@ -318,16 +448,14 @@ class AutobiographicalMemory:
     def _calculate_identity_coherence(self) -> float:
         """Calcular coherencia de identidad basada en memorias"""
         
-        if len(self.memories) < 5:
+        if len(self._index) < 5:
             return 0.0
         
         # Consistencia en tipos de memoria
-        memory_types = [m['memory_type'] for m in self.memories]
-        type_diversity = len(set(memory_types)) / len(memory_types)
+        type_diversity = len(self._index.type_counts) / len(self._index)
         
         # Consistencia en significancia
-        significances = [m['significance_score'] for m in self.memories]
-        significance_stability = 1.0 - np.std(significances)
+        significance_stability = 1.0 - self._index.significance_std
         
         # Coherencia = balance entre diversidad y estabilidad
         coherence = (type_diversity * 0.4 + significance_stability * 0.6)
@@ -337,15 +465,15 @@ class AutobiographicalMemory:
     def _analyze_growth_trajectory(self) -> str:
         """Analizar trayectoria de crecimiento basada en memorias"""
         
-        if len(self.memories) < 10:
+        if len(self._index) < 10:
             return "Desarrollo inicial de identidad"
         
-        # Analizar tendencias temporales
-        recent_memories = self.memories[-10:]
-        early_memories = self.memories[:10]
+        # Analizar tendencias temporales (el almacén está en orden cronológico)
+        recent_memories = self._index.tail(10)
+        early_memories = self._index.head(10)
         
-        recent_significance = np.mean([m['significance_score'] for m in recent_memories])
-        early_significance = np.mean([m['significance_score'] for m in early_memories])
+        recent_significance = np.mean([m.significance_score for m in recent_memories])
+        early_significance = np.mean([m.significance_score for m in early_memories])
         
         growth_rate = recent_significance - early_significance
         
@@ -362,7 +490,17 @@ class AutobiographicalMemory:
         """Consolidar memorias de la sesión actual"""
         
         # Incrementar nivel de consolidación para todas las memorias
-        for memory in self.memories:
-            memory['consolidation_level'] = min(1.0, memory['consolidation_level'] + 0.1)
+        for memory in self._index.records.values():
+            memory.consolidation_level = min(1.0, memory.consolidation_level + 0.1)
+        
+        # Las claves de desalojo dependen del nivel de consolidación
+        self._eviction_heap = [
+            self._eviction_key(memory, seq) for seq, memory in self._index.records.items()
+        ]
+        heapq.heapify(self._eviction_heap)
+        
+        if self._store is not None:
+            self._store.increase_consolidation(0.1)
+            self.flush()
         
         logger.info("Memorias de sesión consolidadas")
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Almacenamiento persistente de la Memoria Autobiográfica - AMIIA-C
+Base de datos SQLite (modo WAL) con columnas ligeras indexadas y la huella completa en JSON
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+from memory.memory_trace import MemoryTrace, MemoryStub
+
+logger = logging.getLogger("AMIIA-C.AutobiographicalStore")
+
+# Separador de los pensamientos clave consolidados (más barato de partir que JSON)
+_THOUGHT_SEPARATOR = "\x1f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    seq INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    memory_type TEXT NOT NULL,
+    emotion TEXT NOT NULL,
+    significance REAL NOT NULL,
+    consolidation_level REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_significance ON memories (significance DESC);
+CREATE TABLE IF NOT EXISTS memory_payloads (
+    seq INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS consolidated (
+    original_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    memory_type TEXT NOT NULL,
+    emotion TEXT NOT NULL,
+    significance REAL NOT NULL,
+    key_thoughts TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class AutobiographicalStore:
+    """
+    Base de datos de AutobiographicalMemory:
+
+    - memories:        una fila ligera por memoria activa; `seq` es la clave del índice
+                       en memoria (el ID de la memoria). Tipo, emoción, significancia y consolidación
+                       bastan para reconstruir índices y montículo al abrir. El índice por
+                       significancia entrega las filas ya en el orden de los buckets de
+                       MemoryIndex, que se cargan sin reordenar
+    - memory_payloads: la huella completa en JSON; se lee solo al hidratar una memoria
+                       (en tabla aparte para que abrir no recorra los payloads)
+    - consolidated:    registros del nivel consolidado (timestamp en segundos desde epoch)
+    - state:        estado serializado (núcleo de identidad)
+
+    Las escrituras se agrupan: se confirma cada `batch_size` operaciones o al llamar a
+    `commit()`. Con WAL y synchronous=NORMAL un fallo solo pierde el lote pendiente.
+    """
+
+    def __init__(self, path: str, batch_size: int = 32):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+
+        logger.info(f"Almacenamiento autobiográfico abierto en {path}")
+
+    @property
+    def needs_commit(self) -> bool:
+        """Hay un lote completo de escrituras sin confirmar."""
+        return self._pending >= self.batch_size
+
+    # Memorias activas
+
+    def add(self, seq: int, memory: MemoryTrace):
+        payload = {
+            'emotional_state': memory.emotional_state,
+            'thoughts': list(memory.thoughts),
+            'context': memory.context,
+            'consciousness_level': float(memory.consciousness_level),
+        }
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memories VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (seq, memory.id, memory.timestamp, memory.memory_type, memory.primary_emotion,
+             memory.significance_score, memory.consolidation_level)
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memory_payloads VALUES (?, ?)",
+            (seq, json.dumps(payload, ensure_ascii=False, default=str))
+        )
+        self._pending += 1
+
+    def load_stubs(self) -> List[Tuple[int, MemoryStub]]:
+        """
+        Registros ligeros de todas las memorias activas, ordenados por
+        (-significancia, seq) gracias al índice de significancia.
+        """
+        # Columnas en el orden de los campos de MemoryStub
+        rows = self._conn.execute(
+            "SELECT seq, id, timestamp, significance, memory_type, emotion, consolidation_level "
+            "FROM memories ORDER BY significance DESC, seq"
+        )
+        return [(row[0], MemoryStub(*row[1:])) for row in rows]
+
+    def load_payload(self, seq: int) -> Dict[str, Any]:
+        """Campos pesados de una huella (estado emocional, pensamientos, contexto)."""
+        row = self._conn.execute("SELECT payload FROM memory_payloads WHERE seq = ?", (seq,)).fetchone()
+        if row is None:
+            raise KeyError(seq)
+        return json.loads(row[0])
+
+    def increase_consolidation(self, amount: float):
+        self._conn.execute(
+            "UPDATE memories SET consolidation_level = MIN(1.0, consolidation_level + ?)", (amount,)
+        )
+        self._pending += 1
+
+    # Nivel consolidado
+
+    def consolidate(self, seq: int, original_id: int, timestamp: str, memory_type: str,
+                    emotion: str, significance: float, key_thoughts: Tuple[str, ...]):
+        """Mover una memoria activa al nivel consolidado."""
+        self._conn.execute("DELETE FROM memories WHERE seq = ?", (seq,))
+        self._conn.execute("DELETE FROM memory_payloads WHERE seq = ?", (seq,))
+        self._conn.execute(
+            "INSERT INTO consolidated VALUES (?, ?, ?, ?, ?, ?)",
+            (original_id, datetime.fromisoformat(timestamp).timestamp(), memory_type, emotion,
+             significance, _THOUGHT_SEPARATOR.join(key_thoughts))
+        )
+        self._pending += 1
+
+    def load_consolidated(self) -> List[Tuple]:
+        """Filas (original_id, timestamp, memory_type, emotion, significance, key_thoughts)."""
+        rows = self._conn.execute(
+            "SELECT original_id, timestamp, memory_type, emotion, significance, key_thoughts "
+            "FROM consolidated ORDER BY rowid"
+        ).fetchall()
+        return [row[:5] + (row[5].split(_THOUGHT_SEPARATOR) if row[5] else [],) for row in rows]
+
+    # Estado
+
+    def save_state(self, key: str, value: Any):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state VALUES (?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, default=str))
+        )
+        self._pending += 1
+
+    def load_state(self, key: str) -> Optional[Any]:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.commit()
+        self._conn.close()
+        self._conn = None
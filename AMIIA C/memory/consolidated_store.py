@@ -0,0 +1,209 @@
+"""
+Almacén de memorias consolidadas - AMIIA-C
+Segundo nivel de la memoria autobiográfica: resúmenes compactos en columnas NumPy
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.ConsolidatedStore")
+
+# Pensamientos clave que se conservan por memoria consolidada
+KEY_THOUGHTS = 2
+
+
+class _Vocabulary:
+    """Tabla de códigos enteros para cadenas repetidas (tipos, emociones, pensamientos)."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Código de un valor ya visto, o -1."""
+        return self._codes.get(value, -1)
+
+
+class ConsolidatedMemoryStore:
+    """
+    Memorias consolidadas en formato columnar:
+
+    - original_id:  ID de la huella de origen (int64)
+    - timestamp:    segundos desde epoch (float64)
+    - type_code:    código del tipo de memoria (int16)
+    - emotion_code: código de la emoción primaria (int16)
+    - significance: significancia (float32)
+    - thought_ids:  (n, KEY_THOUGHTS) códigos de pensamientos clave, -1 si no hay (int32)
+
+    Las cadenas viven una sola vez en vocabularios; cada registro ocupa ~30 bytes.
+    Las columnas crecen geométricamente como las del almacén disperso de SemanticMemory.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._types = _Vocabulary()
+        self._emotions = _Vocabulary()
+        self._thoughts = _Vocabulary()
+        self._size = 0
+
+        # Agregados incrementales para get_summary en O(1)
+        self._type_counts: Counter = Counter()
+        self._significance_sum = 0.0
+        self._time_span: Optional[Tuple[float, float]] = None
+
+        self._original_id = np.empty(initial_capacity, dtype=np.int64)
+        self._timestamp = np.empty(initial_capacity, dtype=np.float64)
+        self._type_code = np.empty(initial_capacity, dtype=np.int16)
+        self._emotion_code = np.empty(initial_capacity, dtype=np.int16)
+        self._significance = np.empty(initial_capacity, dtype=np.float32)
+        self._thought_ids = np.empty((initial_capacity, KEY_THOUGHTS), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, original_id: int, timestamp: str, memory_type: str, emotion: str,
+               significance: float, key_thoughts: Tuple[str, ...]):
+        """Añadir un registro consolidado."""
+        if self._size == self._significance.shape[0]:
+            self._grow(max(1024, 2 * self._size))
+        row = self._size
+        self._original_id[row] = original_id
+        self._timestamp[row] = datetime.fromisoformat(timestamp).timestamp()
+        self._type_code[row] = self._types.encode(memory_type)
+        self._emotion_code[row] = self._emotions.encode(emotion)
+        self._significance[row] = significance
+        thought_ids = [self._thoughts.encode(t) for t in key_thoughts[:KEY_THOUGHTS]]
+        self._thought_ids[row] = thought_ids + [-1] * (KEY_THOUGHTS - len(thought_ids))
+        self._size += 1
+
+        self._type_counts[memory_type] += 1
+        self._significance_sum += float(self._significance[row])
+        ts = float(self._timestamp[row])
+        if self._time_span is None:
+            self._time_span = (ts, ts)
+        else:
+            self._time_span = (min(self._time_span[0], ts), max(self._time_span[1], ts))
+
+    def load(self, rows: List[Tuple[int, float, str, str, float, List[str]]]):
+        """
+        Carga masiva desde el almacenamiento persistente: filas (original_id, timestamp
+        en segundos desde epoch, memory_type, emotion, significance, key_thoughts).
+        """
+        if not rows:
+            return
+        original_ids, timestamps, memory_types, emotions, significances, key_thoughts = zip(*rows)
+        start, end = self._size, self._size + len(rows)
+        if end > self._significance.shape[0]:
+            self._grow(max(1024, end, 2 * self._size))
+        self._original_id[start:end] = original_ids
+        self._timestamp[start:end] = timestamps
+        self._type_code[start:end] = [self._types.encode(t) for t in memory_types]
+        self._emotion_code[start:end] = [self._emotions.encode(e) for e in emotions]
+        self._significance[start:end] = significances
+        thought_ids = self._thought_ids[start:end]
+        thought_ids.fill(-1)
+        for row, thoughts in enumerate(key_thoughts):
+            for col, thought in enumerate(thoughts[:KEY_THOUGHTS]):
+                thought_ids[row, col] = self._thoughts.encode(thought)
+        self._size = end
+
+        self._type_counts.update(memory_types)
+        self._significance_sum += float(self._significance[start:end].sum())
+        span = (float(self._timestamp[start:end].min()), float(self._timestamp[start:end].max()))
+        if self._time_span is not None:
+            span = (min(self._time_span[0], span[0]), max(self._time_span[1], span[1]))
+        self._time_span = span
+
+    @property
+    def max_original_id(self) -> int:
+        """Mayor ID de origen consolidado (-1 si no hay registros)."""
+        return int(self._original_id[: self._size].max()) if self._size else -1
+
+    def find(self, original_id: int) -> Optional[Dict[str, Any]]:
+        """Registro consolidado de una memoria por su ID de origen (escaneo vectorizado)."""
+        rows = np.flatnonzero(self._original_id[: self._size] == original_id)
+        return self.get_record(int(rows[-1])) if rows.shape[0] else None
+
+    def get_record(self, row: int) -> Dict[str, Any]:
+        """Reconstruir un registro consolidado como dict."""
+        emotion = self._emotions.values[self._emotion_code[row]]
+        return {
+            'original_id': int(self._original_id[row]),
+            'timestamp': datetime.fromtimestamp(self._timestamp[row]).isoformat(),
+            'memory_type': self._types.values[self._type_code[row]],
+            'significance_score': float(self._significance[row]),
+            'emotional_essence': emotion or 'neutral',
+            'key_thoughts': [self._thoughts.values[t] for t in self._thought_ids[row] if t >= 0],
+            'consolidation_level': 1.0
+        }
+
+    def query(self, query_type: str, query_emotion: Optional[str], k: int,
+              threshold: float = 0.3) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Top-k registros por relevancia, con la misma fórmula que el nivel activo:
+        0.4·[tipo coincide] + 0.3·[emoción coincide] + 0.3·significancia.
+        `query_emotion=None` indica que la consulta no tiene estado emocional.
+        A igual relevancia gana el registro más antiguo.
+        """
+        n = self._size
+        if n == 0 or k <= 0:
+            return []
+
+        relevance = self._significance[:n].astype(np.float64) * 0.3
+        type_code = self._types.lookup(query_type)
+        if type_code >= 0:
+            relevance += np.where(self._type_code[:n] == type_code, 0.4, 0.0)
+        if query_emotion is not None:
+            emotion_code = self._emotions.lookup(query_emotion)
+            if emotion_code >= 0:
+                relevance += np.where(self._emotion_code[:n] == emotion_code, 0.3, 0.0)
+
+        rows = np.flatnonzero(relevance > threshold)
+        if rows.shape[0] > k:
+            # Conservar los empatados con el k-ésimo antes del desempate por antigüedad
+            kth = relevance[rows[np.argpartition(-relevance[rows], k - 1)[k - 1]]]
+            rows = rows[relevance[rows] >= kth]
+        rows = rows[np.lexsort((rows, -relevance[rows]))][:k]
+        return [(self.get_record(row), float(min(1.0, relevance[row]))) for row in rows.tolist()]
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Estadísticas agregadas del nivel consolidado."""
+        n = self._size
+        return {
+            'total_consolidated': n,
+            'memory_types': dict(self._type_counts),
+            'average_significance': self._significance_sum / n if n else 0.0,
+            'time_span': tuple(datetime.fromtimestamp(ts).isoformat() for ts in self._time_span)
+                         if self._time_span else None,
+            'bytes': self.get_memory_usage()
+        }
+
+    def get_memory_usage(self) -> int:
+        """Bytes reservados por las columnas (sin contar los vocabularios)."""
+        columns = (self._original_id, self._timestamp, self._type_code,
+                   self._emotion_code, self._significance, self._thought_ids)
+        return int(sum(column.nbytes for column in columns))
+
+    # Internos
+
+    def _grow(self, capacity: int):
+        for name in ('_original_id', '_timestamp', '_type_code', '_emotion_code',
+                     '_significance', '_thought_ids'):
+            column = getattr(self, name)
+            grown = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            setattr(self, name, grown)
+        logger.debug(f"Almacén consolidado ampliado a {capacity} registros")
@@ -0,0 +1,165 @@
+"""
+Índices secundarios de la Memoria Autobiográfica - AMIIA-C
+Permiten recuperar memorias relevantes sin recorrer toda la memoria
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+from typing import Dict, List, Optional, Tuple, Iterable, Union
+import logging
+
+from memory.memory_trace import MemoryTrace, MemoryStub
+
+# Las memorias persistidas se indexan como registros ligeros hasta que se hidratan
+IndexedMemory = Union[MemoryTrace, MemoryStub]
+
+logger = logging.getLogger("AMIIA-C.MemoryIndex")
+
+
+class MemoryIndex:
+    """
+    Índices sobre las memorias autobiográficas, mantenidos al codificar experiencias:
+
+    - bucket por tipo de memoria
+    - bucket por emoción primaria
+    - bucket por par (tipo, emoción)
+    - orden global por significancia
+
+    Además mantiene agregados incrementales (conteo por tipo y media/varianza de
+    significancia con el algoritmo de Welford) para resúmenes en O(1).
+
+    Cada bucket es una lista ordenada de claves (-significancia, seq); `seq` es el ID
+    de la memoria, que AutobiographicalMemory asigna de forma monótona, así que sigue
+    el orden de inserción (desempate estable, como el ordenamiento original).
+    `records` es a la vez el almacén cronológico y el índice ID -> memoria.
+    """
+
+    def __init__(self):
+        # seq -> memoria; el orden de inserción del dict es el orden cronológico
+        self.records: Dict[int, IndexedMemory] = {}
+        self._keys: Dict[int, Tuple[str, str, float]] = {}
+        self._by_type: Dict[str, List[Tuple[float, int]]] = {}
+        self._by_emotion: Dict[str, List[Tuple[float, int]]] = {}
+        self._by_pair: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        self._by_significance: List[Tuple[float, int]] = []
+
+        # Agregados incrementales
+        self.type_counts: Counter = Counter()
+        self._significance_mean = 0.0
+        self._significance_m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, memory: IndexedMemory) -> int:
+        """Indexar una memoria (IDs crecientes) y devolver su seq."""
+        seq = memory.id
+
+        memory_type = memory.memory_type
+        emotion = memory.primary_emotion
+        key = (-memory.significance_score, seq)
+
+        self.records[seq] = memory
+        self._keys[seq] = (memory_type, emotion, memory.significance_score)
+        insort(self._by_type.setdefault(memory_type, []), key)
+        insort(self._by_emotion.setdefault(emotion, []), key)
+        insort(self._by_pair.setdefault((memory_type, emotion), []), key)
+        insort(self._by_significance, key)
+
+        self._add_stats(memory)
+        return seq
+
+    def load(self, items: List[Tuple[int, IndexedMemory]]):
+        """
+        Cargar memorias con su seq ya asignado (p.ej. desde el almacenamiento persistente).
+        `items` debe venir ordenado por (-significancia, seq): los buckets se llenan
+        anexando, sin búsquedas binarias.
+        """
+        self.__init__()
+        for seq, memory in items:
+            memory_type = memory.memory_type
+            emotion = memory.primary_emotion
+            key = (-memory.significance_score, seq)
+            self._keys[seq] = (memory_type, emotion, memory.significance_score)
+            self._by_type.setdefault(memory_type, []).append(key)
+            self._by_emotion.setdefault(emotion, []).append(key)
+            self._by_pair.setdefault((memory_type, emotion), []).append(key)
+            self._by_significance.append(key)
+        # El almacén de registros va en orden cronológico
+        for seq, memory in sorted(items, key=lambda item: item[0]):
+            self.records[seq] = memory
+            self._add_stats(memory)
+
+    def remove(self, seq: int) -> IndexedMemory:
+        """Quitar una memoria de todos los índices y devolverla."""
+        memory_type, emotion, significance = self._keys.pop(seq)
+        key = (-significance, seq)
+        for bucket in (self._by_type[memory_type], self._by_emotion[emotion],
+                       self._by_pair[(memory_type, emotion)], self._by_significance):
+            del bucket[bisect_left(bucket, key)]
+
+        self.type_counts[memory_type] -= 1
+        if not self.type_counts[memory_type]:
+            del self.type_counts[memory_type]
+        n = len(self.records) - 1
+        if n == 0:
+            self._significance_mean = self._significance_m2 = 0.0
+        else:
+            # Welford inverso: quitar una observación de la media y la suma de cuadrados
+            old_mean = self._significance_mean
+            self._significance_mean = (old_mean * (n + 1) - significance) / n
+            self._significance_m2 = max(
+                0.0, self._significance_m2 - (significance - old_mean) * (significance - self._significance_mean)
+            )
+        return self.records.pop(seq)
+
+    def rebuild(self, memories: Iterable[IndexedMemory]):
+        """Reconstruir todos los índices (en orden creciente de ID)."""
+        self.__init__()
+        for memory in memories:
+            self.add(memory)
+
+    @property
+    def significance_mean(self) -> float:
+        return self._significance_mean
+
+    @property
+    def significance_std(self) -> float:
+        """Desviación estándar poblacional (como np.std)."""
+        if not self.records:
+            return 0.0
+        return (self._significance_m2 / len(self.records)) ** 0.5
+
+    def head(self, n: int) -> List[IndexedMemory]:
+        """Las n memorias más antiguas."""
+        return list(islice(self.records.values(), n))
+
+    def tail(self, n: int) -> List[IndexedMemory]:
+        """Las n memorias más recientes (de la más reciente a la más antigua)."""
+        return list(islice(reversed(self.records.values()), n))
+
+    def _add_stats(self, memory: IndexedMemory):
+        self.type_counts[memory.memory_type] += 1
+        n = len(self.records)
+        delta = memory.significance_score - self._significance_mean
+        self._significance_mean += delta / n
+        self._significance_m2 += delta * (memory.significance_score - self._significance_mean)
+
+    def candidates(self, query_type: str, query_emotion: Optional[str], k: int) -> List[int]:
+        """
+        Secuencias que pueden estar en el top-k de relevancia.
+
+        La relevancia es 0.4·[tipo coincide] + 0.3·[emoción coincide] + 0.3·significancia;
+        dentro de cada combinación de coincidencias el orden lo decide la significancia,
+        así que basta con el top-k por significancia de cada bucket aplicable.
+        """
+        buckets = [self._by_significance, self._by_type.get(query_type, [])]
+        if query_emotion is not None:
+            buckets.append(self._by_emotion.get(query_emotion, []))
+            buckets.append(self._by_pair.get((query_type, query_emotion), []))
+
+        seqs = set()
+        for bucket in buckets:
+            seqs.update(seq for _, seq in islice(bucket, k))
+        return sorted(seqs)
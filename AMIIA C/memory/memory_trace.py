@@ -0,0 +1,168 @@
+"""
+Huella de memoria autobiográfica - AMIIA-C
+Registro compacto de una experiencia: las memorias referenciadas se guardan por ID
+"""
+
+import json
+from dataclasses import dataclass, fields
+from typing import Dict, List, Any, Tuple
+
+
+# Claves del contexto de trabajo que contienen huellas de memoria completas
+_MEMORY_REFERENCE_KEYS = ('integrated_memories', 'memory_context', 'recent_memories')
+
+# Claves del contexto que se descartan al compactar (copias del estado interno y la
+# distribución de atención por slot del formato anterior)
+_DROPPED_CONTEXT_KEYS = ('internal_state', 'attention_distribution')
+
+
+def _memory_id(memory: Any) -> Any:
+    if isinstance(memory, MemoryTrace):
+        return memory.id
+    if isinstance(memory, dict):
+        return memory.get('id')
+    return memory
+
+
+def compact_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia superficial del contexto con las memorias referenciadas reemplazadas por sus IDs.
+    `integrated_memories` pasa a `integrated_memories_ids` (idem para las otras claves),
+    así el tamaño de una huella no crece con la profundidad de anidamiento.
+    """
+    compact = {}
+    for key, value in (context or {}).items():
+        if key in _DROPPED_CONTEXT_KEYS:
+            continue
+        if key in _MEMORY_REFERENCE_KEYS and isinstance(value, (list, tuple)):
+            compact[f'{key}_ids'] = [_memory_id(memory) for memory in value]
+        else:
+            compact[key] = value
+    return compact
+
+
+@dataclass
+class MemoryTrace:
+    """
+    Huella de memoria autobiográfica.
+
+    Admite acceso estilo dict (`trace['memory_type']`, `trace.get(...)`) para
+    compatibilidad con el formato anterior basado en diccionarios.
+    """
+
+    __slots__ = ('id', 'timestamp', 'significance_score', 'emotional_state', 'thoughts',
+                 'context', 'consciousness_level', 'memory_type', 'consolidation_level')
+
+    id: int
+    timestamp: str
+    significance_score: float
+    emotional_state: Dict[str, Any]
+    thoughts: Tuple[str, ...]
+    context: Dict[str, Any]
+    consciousness_level: float
+    memory_type: str
+    consolidation_level: float
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    @property
+    def primary_emotion(self) -> str:
+        return self.emotional_state.get('primary_emotion', '')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data['thoughts'] = list(self.thoughts)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MemoryTrace':
+        """
+        Crear una huella desde un dict, incluido el formato anterior con
+        contextos anidados (que se compactan a IDs).
+        """
+        return cls(
+            id=data.get('id'),
+            timestamp=data.get('timestamp', ''),
+            significance_score=float(data.get('significance_score', 0.0)),
+            emotional_state=data.get('emotional_state') or {},
+            thoughts=tuple(data.get('thoughts') or ()),
+            context=compact_context(data.get('context') or {}),
+            consciousness_level=float(data.get('consciousness_level', 0.5)),
+            memory_type=data.get('memory_type', 'conversational'),
+            consolidation_level=float(data.get('consolidation_level', 0.0)),
+        )
+
+
+@dataclass
+class MemoryStub:
+    """
+    Registro ligero de una memoria persistida aún no hidratada: solo los campos que
+    usan los índices, el montículo de desalojo y las estadísticas.
+    """
+
+    __slots__ = ('id', 'timestamp', 'significance_score', 'memory_type', 'emotion', 'consolidation_level')
+
+    id: int
+    timestamp: str
+    significance_score: float
+    memory_type: str
+    emotion: str
+    consolidation_level: float
+
+    @property
+    def primary_emotion(self) -> str:
+        return self.emotion
+
+    def hydrate(self, payload: Dict[str, Any]) -> MemoryTrace:
+        """Construir la huella completa con los campos pesados del almacenamiento."""
+        return MemoryTrace(
+            id=self.id,
+            timestamp=self.timestamp,
+            significance_score=self.significance_score,
+            emotional_state=payload['emotional_state'],
+            thoughts=tuple(payload['thoughts']),
+            context=payload['context'],
+            consciousness_level=payload['consciousness_level'],
+            memory_type=self.memory_type,
+            consolidation_level=self.consolidation_level,
+        )
+
+
+def migrate_session_state(session_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Migrar un estado de sesión guardado (consciousness_session.json) al formato compacto:
+    las huellas de `final_internal_state.recent_memories` dejan de anidar contextos.
+    """
+    internal_state = session_state.get('final_internal_state')
+    if isinstance(internal_state, dict) and internal_state.get('recent_memories'):
+        internal_state['recent_memories'] = [
+            MemoryTrace.from_dict(memory).to_dict() if isinstance(memory, dict) else memory
+            for memory in internal_state['recent_memories']
+        ]
+    return session_state
+
+
+def migrate_session_file(path: str):
+    """Reescribir en el sitio un consciousness_session.json con el formato compacto."""
+    with open(path, "r", encoding="utf-8") as f:
+        session_state = json.load(f)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(migrate_session_state(session_state), f, indent=2, default=str)
@@ -1,51 +1,220 @@
 import hashlib
-import math
-from typing import Dict, List, Any, Optional
-from collections import deque
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Any, Optional, Tuple, Union
+from collections import OrderedDict
 import logging
 
+import numpy as np
+
+from memory.semantic_storage import SemanticMemoryStorage
+from memory.sparse_vectors import SparseVectorStore
+from memory.vector_index import ExactIndex, VectorIndex, create_vector_index
+
 logger = logging.getLogger("AMIIA-C.SemanticMemory")
 
+# Modos de embedding disponibles:
+# - "hash": md5/sha1 por token y trigrama (formato original)
+# - "fast": crc32 por palabra + hash multiplicativo vectorizado de trigramas
+EMBEDDING_MODES = ("hash", "fast")
+
+# Formatos de almacenamiento de vectores: matriz densa o CSR disperso
+VECTOR_FORMATS = ("dense", "sparse")
+
+# Constantes del hash multiplicativo de trigramas (modo "fast")
+_TRIGRAM_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64
+)
+_TRIGRAM_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def _content_hash(text: str) -> int:
+    """Hash de contenido (64 bits) del texto normalizado, usado para deduplicar."""
+    normalized = " ".join((text or "").lower().split())
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _trigram_hashes(codes: np.ndarray) -> np.ndarray:
+    """Hash de cada ventana de 3 code points (uint64) en una sola pasada vectorizada."""
+    h = (
+        codes[:-2] * _TRIGRAM_MULTIPLIERS[0]
+        ^ codes[1:-1] * _TRIGRAM_MULTIPLIERS[1]
+        ^ codes[2:] * _TRIGRAM_MULTIPLIERS[2]
+    )
+    h = (h ^ (h >> np.uint64(33))) * _TRIGRAM_MIX
+    return h >> np.uint64(32)
+
 
 class SemanticMemory:
     """
     Memoria semántica ligera basada en hashing de n-gramas y similitud coseno.
-    - No requiere dependencias pesadas
-    - Soporta inserción y consulta top-k
+    - No requiere dependencias pesadas (solo NumPy)
+    - Los embeddings viven en una matriz float32 contigua usada como buffer circular
+    - Soporta inserción y consulta top-k (producto matriz-vector + argpartition)
+    - Caché LRU de embeddings y de resultados top-k por texto normalizado
+    - Índice intercambiable: escaneo exacto o IVF aproximado para memorias grandes
+    - Persistencia opcional en disco (np.memmap + log de metadatos) con carga perezosa;
+      el índice IVF guarda sus centroides al volcar y no re-entrena k-means al abrir
+    - Deduplicación al insertar: hash exacto de contenido y umbral coseno opcional;
+      los duplicados se fusionan en la memoria existente (hit_count, last_seen)
+    - Formato de vectores denso (matriz) o disperso (CSR), útil porque un texto corto
+      solo activa unas decenas de las `embedding_dim` dimensiones
     """
 
-    def __init__(self, embedding_dim: int = 512, max_items: int = 5000):
+    def __init__(self, embedding_dim: int = 512, max_items: int = 5000, embedding_mode: str = "hash",
+                 cache_size: int = 256, index: Union[str, VectorIndex] = "exact",
+                 index_params: Optional[Dict[str, Any]] = None, storage_path: Optional[str] = None,
+                 dedup: bool = False, near_duplicate_threshold: Optional[float] = None,
+                 vector_format: str = "dense"):
+        if embedding_mode not in EMBEDDING_MODES:
+            raise ValueError(f"Modo de embedding desconocido: {embedding_mode}")
+        if vector_format not in VECTOR_FORMATS:
+            raise ValueError(f"Formato de vectores desconocido: {vector_format}")
+        if vector_format == "sparse" and (storage_path or not (index == "exact" or isinstance(index, ExactIndex))):
+            raise ValueError("El formato disperso solo admite el índice exacto y memoria no persistente")
         self.embedding_dim = embedding_dim
         self.max_items = max_items
-        self._items: deque = deque(maxlen=max_items)
-        self._vectors: deque = deque(maxlen=max_items)
+        self.embedding_mode = embedding_mode
+        self.vector_format = vector_format
+
+        # Buffer circular: la fila `_next_slot` es la siguiente en sobrescribirse.
+        # Con almacenamiento, la matriz es el memmap del disco y `_items` se rellena
+        # de forma perezosa desde el log de metadatos.
+        self.storage: Optional[SemanticMemoryStorage] = None
+        if storage_path:
+            self.storage = SemanticMemoryStorage(storage_path, embedding_dim, max_items, embedding_mode)
+            self._matrix = self.storage.vectors
+            self._slot_hashes = self.storage.hashes
+            total = self.storage.total_inserted
+        else:
+            self._matrix = np.zeros((max_items, embedding_dim), dtype=np.float32) if vector_format == "dense" else None
+            self._slot_hashes = np.zeros(max_items, dtype=np.uint64)
+            total = 0
+        self._sparse = SparseVectorStore(max_items, embedding_dim) if vector_format == "sparse" else None
+        self._items: List[Optional[Dict[str, Any]]] = [None] * max_items
+        self._next_slot = total % max_items
+        self._count = min(total, max_items)
+
+        # Deduplicación: hash de contenido -> slot
+        self.dedup = dedup
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._dedup_merges = 0
+        if self.storage and self.storage.hashes_missing:
+            for slot in range(self._count):
+                self._slot_hashes[slot] = _content_hash(self._get_item(slot)["text"])
+        self._hash_to_slot: Dict[int, int] = (
+            dict(zip(self._slot_hashes[: self._count].tolist(), range(self._count))) if dedup else {}
+        )
+
+        if isinstance(index, str):
+            index = create_vector_index(index, max_items, **(index_params or {}))
+        self.index = index
+        self.index.bind(self._matrix)
+        if self._count and not (self.storage and self.index.load(self.storage.index_path,
+                                                                 self.storage.total_inserted)):
+            self.index.add_many(range(self._count))
+
+        # Cachés LRU. Los resultados se invalidan cuando cambia la generación (cada add_memory)
+        self.cache_size = cache_size
+        self._generation = 0
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._result_cache: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._result_cache_generation = 0
+        self._cache_stats = {"embedding_hits": 0, "embedding_misses": 0, "result_hits": 0, "result_misses": 0}
+
+        if self.storage and self.storage.embedding_mode != embedding_mode:
+            # Los vectores en disco se calcularon con otro modo: re-embeber para no mezclar espacios
+            self.embedding_mode = self.storage.embedding_mode
+            self.set_embedding_mode(embedding_mode, reembed=True)
 
         logger.info(
-            f"Memoria Semántica inicializada (dim={embedding_dim}, max_items={max_items})"
+            f"Memoria Semántica inicializada (dim={embedding_dim}, max_items={max_items}, "
+            f"embedding={embedding_mode}, vectores={vector_format}, index={self.index.get_stats()['type']}, "
+            f"persistente={'sí' if self.storage else 'no'}, items={self._count})"
         )
 
+    def __len__(self) -> int:
+        return self._count
+
     def add_memory(self, memory_id: str, text: str, metadata: Optional[Dict[str, Any]] = None):
         """Agregar una memoria con su embedding semántico."""
         if not text:
             return
-        vector = self._embed_text(text)
-        self._items.append({"id": memory_id, "text": text, "metadata": metadata or {}})
-        self._vectors.append(vector)
+        entry = {"id": memory_id, "text": text, "metadata": metadata or {}}
+        self._add_embedded(entry, self._cached_embedding(text), _content_hash(text))
 
     def query(self, text: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Recuperar memorias más similares al texto dado."""
-        if not text or not self._items:
+        if not text or not self._count:
             return []
-        q_vec = self._embed_text(text)
-        scored: List[tuple[float, int]] = []
-        for idx, vec in enumerate(self._vectors):
-            score = self._cosine_similarity(q_vec, vec)
-            scored.append((score, idx))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        results = []
-        for score, idx in scored[: max(1, top_k)]:
-            item = self._items[idx]
-            results.append({"id": item["id"], "text": item["text"], "metadata": item["metadata"], "score": float(score)})
+
+        if self._result_cache_generation != self._generation:
+            self._result_cache.clear()
+            self._result_cache_generation = self._generation
+
+        key = (self._normalize(text), top_k)
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            self._result_cache.move_to_end(key)
+            self._cache_stats["result_hits"] += 1
+            return [dict(hit) for hit in cached]
+        self._cache_stats["result_misses"] += 1
+
+        q_vec = self._cached_embedding(text)
+        results = self._format_hits(*self._search(q_vec, top_k))
+
+        self._cache_put(self._result_cache, key, [dict(hit) for hit in results])
+        return results
+
+    def add_memories(self, memories: Iterable[Union[Tuple[str, str], Tuple[str, str, Optional[Dict[str, Any]]], Dict[str, Any]]]) -> int:
+        """
+        Agregar memorias en lote, embebiéndolas en bloque.
+
+        Args:
+            memories: Iterable de tuplas (id, texto[, metadata]) o dicts {"id", "text", "metadata"}
+
+        Returns:
+            Número de memorias procesadas, incluidos duplicados fusionados (se ignoran textos vacíos)
+        """
+        entries = []
+        for memory in memories:
+            if isinstance(memory, dict):
+                memory_id, text, metadata = memory.get("id"), memory.get("text"), memory.get("metadata")
+            else:
+                memory_id, text, metadata = (tuple(memory) + (None,))[:3]
+            if text:
+                entries.append({"id": memory_id, "text": text, "metadata": metadata or {}})
+        if not entries:
+            return 0
+
+        # Procesar por bloques de como mucho max_items para que un bloque no se pise a sí mismo
+        for start in range(0, len(entries), self.max_items):
+            self._insert_batch(entries[start:start + self.max_items])
+        return len(entries)
+
+    def query_many(self, texts: List[str], top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Consultar varios textos a la vez. Con el índice exacto todas las consultas
+        se puntúan con un único producto matriz-matriz.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        rows = [i for i, text in enumerate(texts) if text]
+        if not rows or not self._count:
+            return results
+
+        q_matrix = self._embed_many([texts[i] for i in rows])
+        candidates = [self.index.candidates(q) for q in q_matrix]
+
+        if all(c is None for c in candidates):
+            # Bloques de consultas para acotar la matriz de scores (consultas x memorias)
+            for start in range(0, len(rows), 256):
+                block = self._scores_block(q_matrix[start:start + 256])
+                for offset, scores in enumerate(block):
+                    slots, top_scores = self._top_k_slots(scores, top_k)
+                    results[rows[start + offset]] = self._format_hits(slots, top_scores)
+        else:
+            for row, q_vec in zip(rows, q_matrix):
+                results[row] = self._format_hits(*self._search(q_vec, top_k))
         return results
 
     def build_context_snippets(self, text: str, top_k: int = 3) -> List[str]:
@@ -53,9 +222,285 @@ class SemanticMemory:
         hits = self.query(text, top_k=top_k)
         return [h["text"] for h in hits]
 
+    def set_embedding_mode(self, mode: str, reembed: bool = True):
+        """
+        Cambiar el motor de embedding.
+
+        Args:
+            mode: "hash" (md5/sha1 original) o "fast" (hash no criptográfico)
+            reembed: Si True, recalcula los vectores ya almacenados con el nuevo modo.
+                     Si False, se conservan tal cual; las consultas compararán vectores
+                     de espacios distintos hasta que esas memorias sean desalojadas.
+        """
+        if mode not in EMBEDDING_MODES:
+            raise ValueError(f"Modo de embedding desconocido: {mode}")
+        if mode == self.embedding_mode:
+            return
+        self.embedding_mode = mode
+        self._embedding_cache.clear()
+        self._generation += 1
+        if reembed:
+            for slot in range(self._count):
+                self._write_vectors(np.array([slot]), self._embed_text(self._get_item(slot)["text"])[None, :])
+            self.index.reset()
+            self.index.add_many(range(self._count))
+        if self.storage:
+            self.storage.set_embedding_mode(mode)
+            # El índice guardado describe los vectores anteriores
+            self.index.save(self.storage.index_path, self.storage.total_inserted)
+        logger.info(f"Modo de embedding cambiado a '{mode}' (re-embebidas: {self._count if reembed else 0})")
+
+    def flush(self):
+        """Forzar la escritura a disco del almacenamiento persistente (incluido el índice)."""
+        if self.storage:
+            self.index.save(self.storage.index_path, self.storage.total_inserted)
+            self.storage.flush()
+
+    def compact_storage(self):
+        """Compactar el log de metadatos en disco (descarta registros de slots desalojados)."""
+        if self.storage:
+            self.storage.compact()
+
+    def close(self):
+        """Cerrar el almacenamiento persistente (los datos quedan en disco)."""
+        if self.storage:
+            self.index.save(self.storage.index_path, self.storage.total_inserted)
+            self.storage.close()
+
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas de deduplicación."""
+        return {
+            "enabled": self.dedup,
+            "near_duplicate_threshold": self.near_duplicate_threshold,
+            "merged_duplicates": self._dedup_merges,
+            "unique_hashes": len(self._hash_to_slot),
+        }
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Obtener el uso de memoria de los vectores almacenados."""
+        if self._sparse is not None:
+            usage = self._sparse.get_memory_usage()
+        else:
+            usage = {"format": "dense", "bytes": int(self._matrix.nbytes)}
+        usage["items"] = self._count
+        usage["bytes_per_item"] = usage["bytes"] / self._count if self._count else 0.0
+        return usage
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Obtener contadores de aciertos/fallos de las cachés LRU."""
+        return {
+            **self._cache_stats,
+            "embedding_cache_size": len(self._embedding_cache),
+            "result_cache_size": len(self._result_cache),
+            "generation": self._generation,
+        }
+
+    def clear_cache(self):
+        """Vaciar las cachés de embeddings y resultados."""
+        self._embedding_cache.clear()
+        self._result_cache.clear()
+
     # Internos
 
-    def _embed_text(self, text: str) -> List[float]:
+    @staticmethod
+    def _normalize(text: str) -> str:
+        # Misma normalización que aplica el embedding: dos textos con la misma clave
+        # producen exactamente el mismo vector
+        return (text or "").lower().strip()
+
+    def _add_embedded(self, entry: Dict[str, Any], vector: np.ndarray, content_hash: int):
+        """Insertar una entrada ya embebida, fusionándola si es un duplicado."""
+        if self.dedup:
+            slot = self._hash_to_slot.get(content_hash)
+            if slot is None and self.near_duplicate_threshold is not None and self._count:
+                slots, scores = self._search(vector, 1)
+                if scores.shape[0] and scores[0] >= self.near_duplicate_threshold:
+                    slot = int(slots[0])
+            if slot is not None:
+                self._merge_duplicate(slot, entry)
+                return
+
+        slot = self._next_slot
+        if self._count == self.max_items:
+            # Desalojo estilo deque: el slot más antiguo se sobrescribe
+            self._evict(slot)
+        self._write_vectors(np.array([slot]), vector[None, :])
+        self._items[slot] = entry
+        self._slot_hashes[slot] = content_hash
+        if self.dedup:
+            self._hash_to_slot[content_hash] = slot
+        if self.storage:
+            self.storage.append(slot, entry)
+        self.index.add(slot)
+        self._next_slot = (slot + 1) % self.max_items
+        self._count = min(self._count + 1, self.max_items)
+        self._generation += 1
+
+    def _merge_duplicate(self, slot: int, entry: Dict[str, Any]):
+        """Fusionar un duplicado en la memoria existente del slot."""
+        item = self._get_item(slot)
+        metadata = dict(item["metadata"])
+        metadata["hit_count"] = metadata.get("hit_count", 1) + 1
+        metadata["last_seen"] = entry["metadata"].get("timestamp") or datetime.now().isoformat()
+        item["metadata"] = metadata
+        if self.storage:
+            self.storage.append(slot, item, new_insert=False)
+        self._dedup_merges += 1
+        self._generation += 1
+
+    def _evict(self, slot: int):
+        self.index.remove(slot)
+        if self.dedup:
+            old_hash = int(self._slot_hashes[slot])
+            if self._hash_to_slot.get(old_hash) == slot:
+                del self._hash_to_slot[old_hash]
+
+    def _insert_batch(self, entries: List[Dict[str, Any]]):
+        """Escribir un bloque (<= max_items) de entradas en el buffer circular."""
+        vectors = self._embed_many([entry["text"] for entry in entries])
+        hashes = [_content_hash(entry["text"]) for entry in entries]
+
+        if self.dedup and self.near_duplicate_threshold is not None:
+            # La comprobación coseno depende de lo ya insertado: secuencial (el embedding sigue en bloque)
+            for entry, vector, content_hash in zip(entries, vectors, hashes):
+                self._add_embedded(entry, vector, content_hash)
+            return
+
+        if self.dedup:
+            keep, pending = [], {}
+            for row, (entry, content_hash) in enumerate(zip(entries, hashes)):
+                slot = self._hash_to_slot.get(content_hash)
+                if slot is not None:
+                    self._merge_duplicate(slot, entry)
+                elif content_hash in pending:
+                    first = entries[pending[content_hash]]
+                    first["metadata"] = {
+                        **first["metadata"],
+                        "hit_count": first["metadata"].get("hit_count", 1) + 1,
+                        "last_seen": entry["metadata"].get("timestamp") or datetime.now().isoformat(),
+                    }
+                    self._dedup_merges += 1
+                else:
+                    pending[content_hash] = row
+                    keep.append(row)
+            if not keep:
+                return
+            entries = [entries[row] for row in keep]
+            vectors = vectors[keep]
+            hashes = [hashes[row] for row in keep]
+
+        n = len(entries)
+        slots = (self._next_slot + np.arange(n)) % self.max_items
+        occupied = slots if self._count == self.max_items else slots[slots < self._count]
+        for slot in occupied.tolist():
+            self._evict(slot)
+
+        self._write_vectors(slots, vectors)
+        self._slot_hashes[slots] = np.asarray(hashes, dtype=np.uint64)
+        for slot, entry, content_hash in zip(slots.tolist(), entries, hashes):
+            self._items[slot] = entry
+            if self.dedup:
+                self._hash_to_slot[content_hash] = slot
+            if self.storage:
+                self.storage.append(slot, entry)
+        self.index.add_many(slots)
+
+        self._next_slot = int((self._next_slot + n) % self.max_items)
+        self._count = min(self._count + n, self.max_items)
+        self._generation += 1
+
+    def _write_vectors(self, slots: np.ndarray, vectors: np.ndarray):
+        if self._sparse is not None:
+            self._sparse.set_many(slots, vectors)
+        else:
+            self._matrix[slots] = vectors
+
+    def _scores_block(self, queries: np.ndarray) -> np.ndarray:
+        """Scores (n_queries, count) de un bloque de consultas contra todas las memorias."""
+        if self._sparse is None:
+            return queries @ self._matrix[: self._count].T
+        # El producto disperso materializa (consultas x no nulos): bloques pequeños
+        return np.concatenate([
+            self._sparse.scores_block(queries[start:start + 32], self._count)
+            for start in range(0, queries.shape[0], 32)
+        ])
+
+    def _format_hits(self, slots: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        results = []
+        for slot, score in zip(slots.tolist(), scores.tolist()):
+            item = self._get_item(slot)
+            results.append({"id": item["id"], "text": item["text"], "metadata": item["metadata"], "score": float(score)})
+        return results
+
+    def _get_item(self, slot: int) -> Dict[str, Any]:
+        """Item de un slot, cargándolo desde el log si aún no está en memoria."""
+        item = self._items[slot]
+        if item is None and self.storage:
+            item = self._items[slot] = self.storage.read(slot)
+        return item
+
+    def _cached_embedding(self, text: str) -> np.ndarray:
+        """Embedding con caché LRU; el vector devuelto es de solo lectura."""
+        key = self._normalize(text)
+        vector = self._embedding_cache.get(key)
+        if vector is not None:
+            self._embedding_cache.move_to_end(key)
+            self._cache_stats["embedding_hits"] += 1
+            return vector
+        self._cache_stats["embedding_misses"] += 1
+        vector = self._embed_text(text)
+        vector.flags.writeable = False
+        self._cache_put(self._embedding_cache, key, vector)
+        return vector
+
+    def _cache_put(self, cache: OrderedDict, key, value):
+        if self.cache_size <= 0:
+            return
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _search(self, q_vec: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Puntuar los candidatos del índice y devolver (slots, scores) ordenados."""
+        slots = self.index.candidates(q_vec)
+        if slots is None:
+            return self._top_k_slots(self._scores_block(q_vec[None, :])[0], top_k)
+        if slots.shape[0] == 0:
+            return slots, np.empty(0, dtype=np.float32)
+        return self._top_k_slots(self._matrix[slots] @ q_vec, top_k, slots)
+
+    def _top_k_slots(self, scores: np.ndarray, top_k: int,
+                     slots: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Los `top_k` mejores scores, de mayor a menor, como (slots, scores).
+        `slots[i]` es el slot de `scores[i]`; si es None, `scores` cubre los slots 0..n-1.
+        Con empates se prefiere la memoria más antigua, como hacía el ordenamiento estable original.
+        """
+        k = min(max(1, top_k), scores.shape[0])
+        if k < scores.shape[0]:
+            # Conservar todos los empatados con el k-ésimo score: argpartition elige
+            # entre ellos al azar y el desempate por antigüedad se hace después
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            best = np.flatnonzero(scores >= kth)
+        else:
+            best = np.arange(scores.shape[0])
+        best_slots = best if slots is None else slots[best]
+        # Antigüedad relativa de cada slot dentro del buffer circular
+        age_rank = (best_slots - self._oldest_slot()) % self.max_items
+        order = np.lexsort((age_rank, -scores[best]))[:k]
+        return best_slots[order], scores[best][order]
+
+    def _oldest_slot(self) -> int:
+        return self._next_slot if self._count == self.max_items else 0
+
+    def _embed_text(self, text: str) -> np.ndarray:
+        """Calcular el embedding de un texto con el modo configurado."""
+        if self.embedding_mode == "fast":
+            return self._embed_text_fast(text)
+        return self._embed_text_hash(text)
+
+    def _embed_text_hash(self, text: str) -> np.ndarray:
         """
         Embedding hash simple:
         - tokenización por palabras + trigramas de caracteres
@@ -63,7 +508,7 @@ class SemanticMemory:
         - normalización L2
         """
         dim = self.embedding_dim
-        vec = [0.0] * dim
+        vec = np.zeros(dim, dtype=np.float32)
 
         cleaned = (text or "").lower().strip()
 
@@ -82,8 +527,77 @@ class SemanticMemory:
             vec[idx] += 0.5
 
         # Normalización L2
-        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
-        return [v / norm for v in vec]
+        norm = float(np.linalg.norm(vec)) or 1.0
+        vec /= norm
+        return vec
+
+    def _embed_text_fast(self, text: str) -> np.ndarray:
+        """
+        Misma estructura que `_embed_text_hash` (palabras con peso 1.0, trigramas con 0.5)
+        pero con hashes estables no criptográficos:
+        - crc32 por palabra
+        - índices de trigramas calculados en bloque sobre los code points
+        - acumulación con np.bincount
+        """
+        dim = self.embedding_dim
+        cleaned = (text or "").lower().strip()
+
+        word_idx = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for token in cleaned.split()),
+            dtype=np.uint64,
+        ) % np.uint64(dim)
+        vec = np.bincount(word_idx.astype(np.intp), minlength=dim).astype(np.float32)
+
+        codes = np.frombuffer(f"^{cleaned}$".encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+        if codes.shape[0] >= 3:
+            tri_idx = _trigram_hashes(codes) % np.uint64(dim)
+            vec += 0.5 * np.bincount(tri_idx.astype(np.intp), minlength=dim)
+
+        norm = float(np.linalg.norm(vec)) or 1.0
+        vec /= norm
+        return vec
+
+    def _embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeddings de varios textos como matriz (n, dim).
+        En modo "fast" todo el lote se acumula con un único np.bincount.
+        """
+        n, dim = len(texts), self.embedding_dim
+        if self.embedding_mode != "fast":
+            out = np.empty((n, dim), dtype=np.float32)
+            for row, text in enumerate(texts):
+                out[row] = self._embed_text(text)
+            return out
+
+        cleaned = [(text or "").lower().strip() for text in texts]
+
+        # Palabras: (fila, índice) con peso 1.0
+        word_rows, word_hashes = [], []
+        for row, clean in enumerate(cleaned):
+            for token in clean.split():
+                word_rows.append(row)
+                word_hashes.append(zlib.crc32(token.encode("utf-8")))
+        word_flat = (
+            np.asarray(word_rows, dtype=np.int64) * dim
+            + (np.asarray(word_hashes, dtype=np.uint64) % np.uint64(dim)).astype(np.int64)
+        )
+
+        # Trigramas: todos los textos concatenados; se descartan las ventanas que cruzan textos
+        chunks = [f"^{clean}$" for clean in cleaned]
+        lengths = np.fromiter((len(c) for c in chunks), dtype=np.int64, count=n)
+        codes = np.frombuffer("".join(chunks).encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+        char_rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        if codes.shape[0] >= 3:
+            valid = char_rows[:-2] == char_rows[2:]
+            tri_idx = (_trigram_hashes(codes)[valid] % np.uint64(dim)).astype(np.int64)
+            tri_flat = char_rows[:-2][valid] * dim + tri_idx
+        else:
+            tri_flat = np.empty(0, dtype=np.int64)
 
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        return float(sum(x * y for x, y in zip(a, b)))
\ No newline at end of file
+        flat = np.concatenate([word_flat, tri_flat])
+        weights = np.concatenate([np.ones(word_flat.shape[0]), np.full(tri_flat.shape[0], 0.5)])
+        out = np.bincount(flat, weights=weights, minlength=n * dim).reshape(n, dim).astype(np.float32)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        out /= norms
+        return out
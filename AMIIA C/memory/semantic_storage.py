@@ -0,0 +1,177 @@
+"""
+Almacenamiento persistente de la Memoria Semántica - AMIIA-C
+Vectores en un np.memmap y metadatos en un log de solo-anexado
+"""
+
+import json
+import os
+from typing import Dict, Any, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.SemanticStorage")
+
+STORAGE_FORMAT_VERSION = 1
+
+# Cabecera del fichero de índice de slots: [total de inserciones, registros en items.log]
+_HEADER_SIZE = 2
+
+
+class SemanticMemoryStorage:
+    """
+    Formato en disco de SemanticMemory (un directorio):
+
+    - meta.json:   dimensión, capacidad y modo de embedding
+    - vectors.f32: matriz (max_items, dim) float32 mapeada en memoria; es el propio
+                   buffer circular de SemanticMemory, así que no se copia a RAM al abrir
+    - items.log:   un registro JSON por línea con {slot, id, text, metadata}; solo se anexa.
+                   compact() lo reescribe; se llama solo cuando los registros obsoletos
+                   (desalojos, fusiones de duplicados) superan a los vigentes
+    - slots.idx:   int64 mapeado en memoria: total de inserciones, registros en items.log
+                   y offset en items.log del último registro de cada slot (-1 si está vacío)
+    - hashes.u64:  hash de contenido de cada slot, para reconstruir la deduplicación sin leer el log
+    - index.npz:   estado del índice vectorial entrenado (centroides IVF y listas), guardado
+                   al volcar; sin él, el índice IVF se re-entrena al abrir
+
+    Los registros se leen de items.log solo cuando se necesitan (carga perezosa).
+    """
+
+    def __init__(self, path: str, embedding_dim: int, max_items: int, embedding_mode: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._log_path = os.path.join(path, "items.log")
+        self._index_path = os.path.join(path, "slots.idx")
+        self._hashes_path = os.path.join(path, "hashes.u64")
+        self.index_path = os.path.join(path, "index.npz")
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+            if (self.meta["embedding_dim"], self.meta["max_items"]) != (embedding_dim, max_items):
+                raise ValueError(
+                    f"Almacenamiento semántico en {path} creado con dim={self.meta['embedding_dim']}, "
+                    f"max_items={self.meta['max_items']}; no coincide con dim={embedding_dim}, "
+                    f"max_items={max_items}"
+                )
+            file_mode = "r+"
+        else:
+            self.meta = {
+                "format": STORAGE_FORMAT_VERSION,
+                "embedding_dim": embedding_dim,
+                "max_items": max_items,
+                "embedding_mode": embedding_mode,
+            }
+            self._write_meta()
+            file_mode = "w+"
+
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=file_mode,
+                                 shape=(max_items, embedding_dim))
+        self._slots = np.memmap(self._index_path, dtype=np.int64, mode=file_mode,
+                                shape=(_HEADER_SIZE + max_items,))
+        if file_mode == "w+":
+            self._slots[_HEADER_SIZE:] = -1
+            self._slots.flush()
+
+        # Almacenes anteriores a la deduplicación no tienen hashes.u64: se crea vacío y
+        # SemanticMemory lo rellena a partir del log (`hashes_missing`)
+        self.hashes_missing = not os.path.exists(self._hashes_path) and self.total_inserted > 0
+        self.hashes = np.memmap(self._hashes_path, dtype=np.uint64,
+                                mode="r+" if os.path.exists(self._hashes_path) else "w+",
+                                shape=(max_items,))
+
+        self._log = open(self._log_path, "ab")
+        self._reader = open(self._log_path, "rb")
+
+        # Almacenes anteriores sin contador de registros: se cuentan como si no hubiera
+        # obsoletos (el siguiente compact() lo corrige)
+        if self._slots[1] < self.live_slots:
+            self._slots[1] = self.live_slots
+
+        logger.info(f"Almacenamiento semántico abierto en {path} ({self.total_inserted} inserciones previas)")
+
+    @property
+    def total_inserted(self) -> int:
+        return int(self._slots[0])
+
+    @property
+    def live_slots(self) -> int:
+        """Slots con registro vigente (el buffer circular se llena en orden y no se vacía)."""
+        return min(self.total_inserted, self.meta["max_items"])
+
+    @property
+    def embedding_mode(self) -> str:
+        return self.meta["embedding_mode"]
+
+    def set_embedding_mode(self, mode: str):
+        self.meta["embedding_mode"] = mode
+        self._write_meta()
+
+    def append(self, slot: int, item: Dict[str, Any], new_insert: bool = True):
+        """
+        Anexar el registro de un slot al log y apuntar el slot a él.
+        El vector ya debe estar escrito en `vectors`. Con `new_insert=False`
+        (p.ej. actualización de metadatos) no se incrementa el contador de inserciones.
+        """
+        offset = self._log.tell()
+        record = {"slot": slot, **item}
+        self._log.write(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        self._log.flush()
+        self._slots[_HEADER_SIZE + slot] = offset
+        if new_insert:
+            self._slots[0] += 1
+        self._slots[1] += 1
+        live = self.live_slots
+        if self._slots[1] - live > max(min(16, self.meta["max_items"]), live):
+            self.compact()
+
+    def read(self, slot: int) -> Optional[Dict[str, Any]]:
+        """Leer el último registro de un slot desde el log."""
+        offset = int(self._slots[_HEADER_SIZE + slot])
+        if offset < 0:
+            return None
+        self._reader.seek(offset)
+        record = json.loads(self._reader.readline().decode("utf-8"))
+        record.pop("slot", None)
+        return record
+
+    def compact(self):
+        """
+        Reescribir items.log dejando solo el último registro de cada slot.
+        El log crece con cada desalojo del buffer circular; compactar recupera ese espacio.
+        """
+        tmp_path = self._log_path + ".tmp"
+        offsets = np.full(self.meta["max_items"], -1, dtype=np.int64)
+        with open(tmp_path, "wb") as out:
+            for slot in np.flatnonzero(self._slots[_HEADER_SIZE:] >= 0).tolist():
+                self._reader.seek(int(self._slots[_HEADER_SIZE + slot]))
+                offsets[slot] = out.tell()
+                out.write(self._reader.readline())
+        self._log.close()
+        self._reader.close()
+        os.replace(tmp_path, self._log_path)
+        self._log = open(self._log_path, "ab")
+        self._reader = open(self._log_path, "rb")
+        self._slots[_HEADER_SIZE:] = offsets
+        self._slots[1] = int(np.count_nonzero(offsets >= 0))
+        self.flush()
+        logger.debug("Log de memoria semántica compactado")
+
+    def flush(self):
+        self.vectors.flush()
+        self._slots.flush()
+        self.hashes.flush()
+        self._log.flush()
+
+    def close(self):
+        if self._log.closed:
+            return
+        self.flush()
+        self._log.close()
+        self._reader.close()
+
+    def _write_meta(self):
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
@@ -0,0 +1,142 @@
+"""
+Almacén de vectores dispersos para la Memoria Semántica - AMIIA-C
+Filas en formato CSR (indptr/indices/data) indexadas por slot del buffer circular
+"""
+
+from typing import Dict, Any
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.SparseVectors")
+
+
+class SparseVectorStore:
+    """
+    Vectores dispersos de SemanticMemory en formato CSR compartido por todo el almacén.
+
+    - Cada escritura de un slot anexa una fila nueva (solo índices/valores no nulos)
+    - La fila anterior del slot queda muerta y se descarta al compactar
+    - El score es un producto disperso: data * q[indices] sumado por fila con np.add.reduceat
+    """
+
+    def __init__(self, max_items: int, embedding_dim: int):
+        self.max_items = max_items
+        self.embedding_dim = embedding_dim
+        self._index_dtype = np.uint16 if embedding_dim <= np.iinfo(np.uint16).max else np.int32
+
+        self._indices = np.empty(0, dtype=self._index_dtype)
+        self._data = np.empty(0, dtype=np.float32)
+        self._indptr = np.zeros(1, dtype=np.int64)  # filas 0..n_rows-1
+        self._row_slot = np.empty(0, dtype=np.int64)  # slot de cada fila (-1 = fila muerta)
+        self._nnz = 0
+        self._n_rows = 0
+        self._dead_rows = 0
+        self._slot_row = np.full(max_items, -1, dtype=np.int64)
+
+    def set(self, slot: int, vector: np.ndarray):
+        """Escribir el vector (denso) de un slot."""
+        nz = np.flatnonzero(vector)
+        self._append_rows(np.array([slot]), [nz], [vector[nz]])
+
+    def set_many(self, slots: np.ndarray, vectors: np.ndarray):
+        """Escribir varios slots a partir de una matriz densa (n, dim)."""
+        rows, cols = np.nonzero(vectors)
+        counts = np.bincount(rows, minlength=vectors.shape[0])
+        splits = np.cumsum(counts)[:-1]
+        self._append_rows(np.asarray(slots), np.split(cols, splits), np.split(vectors[rows, cols], splits))
+
+    def scores(self, query: np.ndarray, count: int) -> np.ndarray:
+        """Scores (producto punto) de los slots 0..count-1 frente a una consulta densa."""
+        return self.scores_block(query[None, :], count)[0]
+
+    def scores_block(self, queries: np.ndarray, count: int) -> np.ndarray:
+        """Scores (n_queries, count) para un bloque de consultas densas."""
+        out = np.zeros((queries.shape[0], count), dtype=np.float32)
+        if self._nnz == 0:
+            return out
+        starts = self._indptr[:-1][: self._n_rows]
+        empty = starts == self._indptr[1 : self._n_rows + 1]
+        live = (self._row_slot[: self._n_rows] >= 0) & (self._row_slot[: self._n_rows] < count)
+        # Columna cero final: las filas vacías al final tienen start == nnz
+        products = np.zeros((queries.shape[0], self._nnz + 1), dtype=np.float32)
+        np.multiply(queries[:, self._indices[: self._nnz]], self._data[: self._nnz], out=products[:, : self._nnz])
+        sums = np.add.reduceat(products, starts, axis=1)
+        sums[:, empty] = 0.0
+        out[:, self._row_slot[: self._n_rows][live]] = sums[:, live]
+        return out
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        arrays = (self._indices, self._data, self._indptr, self._row_slot, self._slot_row)
+        return {
+            "format": "sparse",
+            "bytes": int(sum(a.nbytes for a in arrays)),
+            "nnz": int(self._nnz),
+            "rows": int(self._n_rows),
+            "dead_rows": int(self._dead_rows),
+        }
+
+    # Internos
+
+    def _append_rows(self, slots: np.ndarray, row_indices, row_values):
+        n_new = slots.shape[0]
+        new_nnz = int(sum(len(idx) for idx in row_indices))
+
+        # Marcar como muertas las filas anteriores de estos slots
+        old_rows = self._slot_row[slots]
+        old_rows = old_rows[old_rows >= 0]
+        self._row_slot[old_rows] = -1
+        self._dead_rows += int(old_rows.shape[0])
+        # Compactar cuando las filas muertas superan a las vivas (con un mínimo pequeño,
+        # acotado por max_items, para no compactar en cada sobrescritura)
+        if self._dead_rows > max(min(16, self.max_items), self._n_rows - self._dead_rows):
+            self._compact()
+
+        self._reserve(self._nnz + new_nnz, self._n_rows + n_new)
+        pos = self._nnz
+        for row_offset, (idx, vals) in enumerate(zip(row_indices, row_values)):
+            end = pos + len(idx)
+            self._indices[pos:end] = idx
+            self._data[pos:end] = vals
+            pos = end
+            self._indptr[self._n_rows + row_offset + 1] = end
+        self._row_slot[self._n_rows:self._n_rows + n_new] = slots
+        self._slot_row[slots] = np.arange(self._n_rows, self._n_rows + n_new)
+        self._nnz = pos
+        self._n_rows += n_new
+
+    def _reserve(self, nnz: int, n_rows: int):
+        """Crecimiento geométrico de los arrays CSR."""
+        if nnz > self._indices.shape[0]:
+            size = max(nnz, 2 * self._indices.shape[0], 1024)
+            self._indices = self._grow(self._indices, size)
+            self._data = self._grow(self._data, size)
+        if n_rows > self._row_slot.shape[0]:
+            size = max(n_rows, 2 * self._row_slot.shape[0], 64)
+            self._row_slot = self._grow(self._row_slot, size)
+            self._indptr = self._grow(self._indptr, size + 1)
+
+    @staticmethod
+    def _grow(array: np.ndarray, size: int) -> np.ndarray:
+        grown = np.empty(size, dtype=array.dtype)
+        grown[: array.shape[0]] = array
+        return grown
+
+    def _compact(self):
+        """Eliminar filas muertas reescribiendo los arrays CSR."""
+        n_rows = self._n_rows
+        live_rows = np.flatnonzero(self._row_slot[:n_rows] >= 0)
+        starts = self._indptr[live_rows]
+        lengths = self._indptr[live_rows + 1] - starts
+        # Posiciones de todos los no nulos de las filas vivas, en orden
+        gather = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(lengths.sum())
+
+        self._indices = self._indices[gather]
+        self._data = self._data[gather]
+        self._indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self._row_slot = self._row_slot[live_rows]
+        self._slot_row[self._row_slot] = np.arange(live_rows.shape[0])
+        self._nnz = int(lengths.sum())
+        self._n_rows = int(live_rows.shape[0])
+        self._dead_rows = 0
+        logger.debug(f"Almacén disperso compactado: {self._n_rows} filas, {self._nnz} no nulos")
@@ -0,0 +1,269 @@
+"""
+Índices vectoriales para la Memoria Semántica - AMIIA-C
+Deciden qué filas del buffer circular de SemanticMemory se puntúan en cada consulta
+"""
+
+import os
+from typing import Dict, Any, Iterable, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.VectorIndex")
+
+
+class VectorIndex:
+    """
+    Interfaz de índice sobre la matriz de embeddings de SemanticMemory.
+
+    El índice trabaja con números de slot del buffer circular: SemanticMemory
+    llama a `add` al escribir un slot y a `remove` antes de sobrescribirlo.
+    `candidates` devuelve los slots a puntuar para una consulta, o None para
+    indicar un escaneo exacto de toda la memoria. `save` / `load` persisten el
+    estado entrenado junto al almacenamiento de SemanticMemory.
+    """
+
+    def bind(self, matrix: np.ndarray):
+        """Asociar el índice a la matriz de embeddings (filas = slots)."""
+        self._matrix = matrix
+
+    def add(self, slot: int):
+        pass
+
+    def add_many(self, slots: Iterable[int]):
+        for slot in slots:
+            self.add(int(slot))
+
+    def remove(self, slot: int):
+        pass
+
+    def candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        return None
+
+    def reset(self):
+        pass
+
+    def save(self, path: str, stamp: int):
+        """Guardar el estado del índice en `path`; `stamp` identifica los vectores indexados."""
+        pass
+
+    def load(self, path: str, stamp: int) -> bool:
+        """
+        Restaurar el estado guardado en `path`. Devuelve True si el índice queda
+        completo (mismo `stamp`); si no, hay que añadir los slots con `add_many`.
+        """
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"type": "exact"}
+
+
+class ExactIndex(VectorIndex):
+    """Escaneo lineal exacto: todas las memorias son candidatas."""
+
+
+class IVFIndex(VectorIndex):
+    """
+    Índice IVF (inverted file) con centroides de k-means esférico.
+
+    - Hasta acumular `train_size` vectores se comporta como un escaneo exacto
+    - Tras entrenar, cada slot vive en la lista de su centroide más cercano
+    - `nprobe` es el control recall/latencia: número de listas visitadas por consulta
+    """
+
+    def __init__(self, max_items: int, nlist: Optional[int] = None, nprobe: int = 8,
+                 train_size: Optional[int] = None, kmeans_iterations: int = 10, seed: int = 0):
+        self.max_items = max_items
+        self.nlist = nlist or max(1, int(np.sqrt(max_items)))
+        self.nprobe = nprobe
+        self.train_size = min(max_items, train_size or max(self.nlist * 32, 256))
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+        self._matrix: Optional[np.ndarray] = None
+        self.reset()
+
+    def reset(self):
+        self.centroids: Optional[np.ndarray] = None
+        self._pending: Dict[int, None] = {}  # slots aún sin asignar (antes de entrenar)
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._slot_list = np.full(self.max_items, -1, dtype=np.int64)
+        self._slot_pos = np.zeros(self.max_items, dtype=np.int64)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, slot: int):
+        if not self.is_trained:
+            self._pending[slot] = None
+            if len(self._pending) >= self.train_size:
+                self.train()
+            return
+        vector = self._matrix[slot]
+        self._append(slot, int(np.argmax(self.centroids @ vector)))
+
+    def add_many(self, slots: Iterable[int]):
+        slots = np.asarray(slots if isinstance(slots, np.ndarray) else list(slots), dtype=np.int64)
+        if not self.is_trained:
+            room = self.train_size - len(self._pending)
+            for slot in slots[:room]:
+                self._pending[int(slot)] = None
+            if len(self._pending) < self.train_size:
+                return
+            self.train()
+            slots = slots[room:]
+        for assignment, chunk in self._assign_chunks(slots):
+            for slot, list_id in zip(chunk.tolist(), assignment.tolist()):
+                self._append(slot, list_id)
+
+    def remove(self, slot: int):
+        if not self.is_trained:
+            self._pending.pop(slot, None)
+            return
+        list_id = self._slot_list[slot]
+        if list_id < 0:
+            return
+        # Intercambiar con el último elemento de la lista: O(1)
+        pos = self._slot_pos[slot]
+        last = self._list_sizes[list_id] - 1
+        members = self._lists[list_id]
+        moved = members[last]
+        members[pos] = moved
+        self._slot_pos[moved] = pos
+        self._list_sizes[list_id] = last
+        self._slot_list[slot] = -1
+
+    def candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if not self.is_trained:
+            return None
+        nprobe = min(self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probed = np.arange(self.nlist)
+        return np.concatenate([self._lists[i][: self._list_sizes[i]] for i in probed])
+
+    def train(self):
+        """Entrenar centroides con los slots pendientes y asignarlos a sus listas."""
+        slots = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        if slots.shape[0] == 0:
+            return
+        sample_size = min(slots.shape[0], self.nlist * 64)
+        sample = self._matrix[self._rng.choice(slots, size=sample_size, replace=False)]
+        self.centroids = self._spherical_kmeans(sample)
+        self._pending.clear()
+        for assignment, chunk in self._assign_chunks(slots):
+            for slot, list_id in zip(chunk.tolist(), assignment.tolist()):
+                self._append(slot, list_id)
+        logger.info(f"Índice IVF entrenado: {self.nlist} listas con {slots.shape[0]} vectores")
+
+    def rebuild(self):
+        """Re-entrenar los centroides con los vectores vivos (útil si los datos derivan)."""
+        live = np.flatnonzero(self._slot_list >= 0) if self.is_trained else None
+        if live is None:
+            return
+        self.reset()
+        self._pending = dict.fromkeys(live.tolist())
+        self.train()
+
+    def save(self, path: str, stamp: int):
+        """Guardar centroides y asignación de slots (.npz); sin entrenar no hay nada que guardar."""
+        if not self.is_trained:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, centroids=self.centroids, slot_list=self._slot_list, stamp=np.int64(stamp))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, stamp: int) -> bool:
+        """
+        Cargar los centroides guardados, sin volver a entrenar k-means. Si `stamp`
+        coincide se restauran también las listas invertidas; si no (p.ej. cierre sin
+        volcar), los slots se reasignan a los centroides cargados con `add_many`.
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            centroids, slot_list, saved_stamp = data["centroids"], data["slot_list"], int(data["stamp"])
+        if centroids.shape != (self.nlist, self._matrix.shape[1]) or slot_list.shape != (self.max_items,):
+            logger.warning(f"Índice IVF guardado en {path} no coincide con los parámetros actuales; se re-entrena")
+            return False
+        self.reset()
+        self.centroids = centroids.astype(np.float32)
+        if saved_stamp != stamp:
+            return False
+        slots = np.flatnonzero(slot_list >= 0)
+        slots = slots[np.argsort(slot_list[slots], kind="stable")]
+        sizes = np.bincount(slot_list[slots], minlength=self.nlist)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        for list_id in np.flatnonzero(sizes).tolist():
+            members = slots[starts[list_id]:starts[list_id] + sizes[list_id]]
+            self._lists[list_id] = members.copy()
+            self._slot_pos[members] = np.arange(members.shape[0])
+        self._list_sizes[:] = sizes
+        self._slot_list[:] = slot_list
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        sizes = self._list_sizes
+        return {
+            "type": "ivf",
+            "trained": self.is_trained,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "indexed": int(sizes.sum()) if self.is_trained else len(self._pending),
+            "largest_list": int(sizes.max()) if self.is_trained else 0,
+        }
+
+    # Internos
+
+    def _append(self, slot: int, list_id: int):
+        size = self._list_sizes[list_id]
+        members = self._lists[list_id]
+        if size == members.shape[0]:
+            grown = np.empty(max(8, size * 2), dtype=np.int64)
+            grown[:size] = members[:size]
+            self._lists[list_id] = members = grown
+        members[size] = slot
+        self._slot_list[slot] = list_id
+        self._slot_pos[slot] = size
+        self._list_sizes[list_id] = size + 1
+
+    def _assign_chunks(self, slots: np.ndarray, chunk_size: int = 8192):
+        for start in range(0, slots.shape[0], chunk_size):
+            chunk = slots[start:start + chunk_size]
+            yield np.argmax(self._matrix[chunk] @ self.centroids.T, axis=1), chunk
+
+    def _spherical_kmeans(self, data: np.ndarray) -> np.ndarray:
+        k = min(self.nlist, data.shape[0])
+        centroids = data[self._rng.choice(data.shape[0], size=k, replace=False)].astype(np.float32)
+        for _ in range(self.kmeans_iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Centroides vacíos se re-siembran con puntos aleatorios
+            if empty.any():
+                sums[empty] = data[self._rng.choice(data.shape[0], size=int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        if k < self.nlist:
+            # Menos datos que listas: las listas sobrantes quedan con centroides nulos
+            padded = np.zeros((self.nlist, data.shape[1]), dtype=np.float32)
+            padded[:k] = centroids
+            centroids = padded
+        return centroids.astype(np.float32)
+
+
+def create_vector_index(index_type: str, max_items: int, **params) -> VectorIndex:
+    """Crear un índice vectorial a partir de su nombre ("exact" o "ivf")."""
+    if index_type == "exact":
+        return ExactIndex()
+    if index_type == "ivf":
+        return IVFIndex(max_items=max_items, **params)
+    raise ValueError(f"Tipo de índice desconocido: {index_type}")
@@ -3,27 +3,126 @@ Sistema de Memoria de Trabajo - AMIIA-C
 Maneja información activa en el procesamiento consciente
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Mapping
 import logging
 from datetime import datetime
-from collections import deque
+from collections import deque, OrderedDict
+from itertools import islice
+
+import numpy as np
 
 logger = logging.getLogger("AMIIA-C.WorkingMemory")
 
+# Tamaño de las ventanas del contexto integrado
+_INTEGRATED_THOUGHTS = 5
+_INTEGRATED_MEMORIES = 3
+
+
+class AttentionDistribution(Mapping):
+    """
+    Pesos de atención (posición cronológica -> peso) respaldados por un array NumPy.
+    Se usa como un dict de solo lectura.
+    """
+
+    def __init__(self, weights: np.ndarray):
+        self._weights = weights
+
+    def __getitem__(self, index: int) -> float:
+        if not isinstance(index, (int, np.integer)) or not 0 <= index < self._weights.shape[0]:
+            raise KeyError(index)
+        return float(self._weights[index])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._weights.shape[0]))
+
+    def __len__(self) -> int:
+        return self._weights.shape[0]
+
+    def as_array(self) -> np.ndarray:
+        return self._weights
+
 
 class WorkingMemory:
     """
-    Sistema de memoria de trabajo que mantiene información activa para procesamiento consciente
+    Sistema de memoria de trabajo que mantiene información activa para procesamiento consciente.
+
+    Los items viven en un buffer circular de tamaño fijo; la relevancia de cada slot está
+    en un array NumPy con su total acumulado, y el contexto integrado (pensamientos,
+    memorias y máximo emocional por clave) se mantiene incrementalmente al insertar y
+    desalojar, así que un ciclo no recorre todos los slots en Python.
     """
     
-    def __init__(self, slots: int = 7):
-        self.slots = slots  # Límite de memoria de trabajo (basado en investigación cognitiva)
-        self.active_items = deque(maxlen=slots)
-        self.attention_weights = {}
-        self.context_buffer = {}
+    def __init__(self, slots: int = 7, context_buffer_size: int = 10):
+        self.slots = slots  # Límite de memoria de trabajo (ampliable para conversaciones largas)
+        self._items: List[Optional[Dict[str, Any]]] = [None] * slots
+        self._relevance = np.zeros(slots, dtype=np.float64)
+        self._total_relevance = 0.0
+        self._pushed = 0  # inserciones totales; el item i-ésimo vive en el slot i % slots
+        
+        # Ventanas del contexto integrado: entradas (nº de inserción, valor)
+        self._recent_thoughts: deque = deque(maxlen=_INTEGRATED_THOUGHTS)
+        self._recent_memories: deque = deque(maxlen=_INTEGRATED_MEMORIES)
+        # Máximo deslizante por emoción: deque monótona decreciente de (nº de inserción, valor)
+        self._emotion_max: Dict[str, deque] = {}
+        
+        # Contextos adicionales en orden de llegada, con claves monótonas (desalojo FIFO)
+        self.context_buffer_size = context_buffer_size
+        self.context_buffer: OrderedDict = OrderedDict()
+        self._next_context_id = 0
         
         logger.info(f"Memoria de Trabajo inicializada - Slots: {slots}")
     
+    def __len__(self) -> int:
+        return min(self._pushed, self.slots)
+    
+    @property
+    def active_items(self) -> List[Dict[str, Any]]:
+        """Items activos en orden cronológico (copia)."""
+        n = len(self)
+        start = self._pushed - n
+        return [self._items[i % self.slots] for i in range(start, self._pushed)]
+    
+    @property
+    def attention_weights(self) -> AttentionDistribution:
+        """
+        Peso de atención de cada item (0 = más antiguo): su parte de la relevancia total
+        más un ligero boost por recencia. Se calcula vectorizado desde el buffer circular.
+        """
+        n = len(self)
+        if n == 0 or self._total_relevance <= 0:
+            return AttentionDistribution(np.zeros(0))
+        # Orden cronológico: desde el slot del más antiguo hasta el final, y luego el inicio
+        start = self._pushed % self.slots if n == self.slots else 0
+        weights = np.concatenate((self._relevance[start:n], self._relevance[:start]))
+        weights /= self._total_relevance
+        weights += np.arange(1, n + 1) * (0.1 / n)  # Items más recientes tienen ligero boost
+        return AttentionDistribution(weights)
+    
+    def attention_summary(self) -> Dict[str, float]:
+        """
+        Resumen de tamaño fijo de `attention_weights`: pico, media y peso del item más
+        reciente, en O(1) respecto al número de slots.
+        
+        La media sale del total acumulado. Para el pico basta mirar los items recientes:
+        un item `d` posiciones más antiguo pierde `d * 0.1 / n` de boost por recencia y
+        su relevancia (<= 1.0) solo puede superar a la del más reciente en
+        `1.0 - relevancia_reciente`.
+        """
+        n = len(self)
+        if n == 0 or self._total_relevance <= 0:
+            return {'peak': 0.0, 'mean': 0.0, 'newest': 0.0}
+        step = 0.1 / n
+        newest_relevance = float(self._relevance[(self._pushed - 1) % self.slots])
+        window = min(n, int((1.0 - newest_relevance) / (self._total_relevance * step)) + 1)
+        seqs = np.arange(self._pushed - window, self._pushed)
+        positions = seqs - (self._pushed - n)  # 0 = más antiguo
+        weights = self._relevance[seqs % self.slots] / self._total_relevance + (positions + 1) * step
+        return {
+            'peak': float(weights.max()),
+            'mean': 1.0 / n + 0.05 * (n + 1) / n,  # las relevancias suman el total
+            'newest': newest_relevance / self._total_relevance + 0.1,
+        }
+    
     def process_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Procesar entrada y mantener en memoria de trabajo
@@ -35,12 +134,9 @@ class WorkingMemory:
             Contexto procesado para la red de conciencia
         """
         
-        # Agregar nueva información
+        # Agregar nueva información (actualiza relevancia total y ventanas integradas)
         self.add_to_working_memory(input_data)
         
-        # Actualizar pesos de atención
-        self._update_attention_weights()
-        
         # Crear contexto integrado
         working_context = self._create_integrated_context()
         
@@ -57,24 +153,62 @@ class WorkingMemory:
             'relevance_score': self._calculate_relevance(item)
         }
         
-        # Si está llena, el deque automáticamente remueve el más antiguo
-        self.active_items.append(memory_item)
+        # Si está llena, se sobrescribe el slot del más antiguo
+        seq = self._pushed
+        slot = seq % self.slots
+        evicted = seq >= self.slots
+        relevance = memory_item['relevance_score']
+        self._items[slot] = memory_item
+        self._total_relevance += relevance - (float(self._relevance[slot]) if evicted else 0.0)
+        self._relevance[slot] = relevance
+        self._pushed += 1
+        if evicted and slot == 0:
+            # Recalcular el total una vez por vuelta para no acumular error de redondeo
+            self._total_relevance = float(self._relevance.sum())
+        
+        self._integrate_item(seq, item, relevance)
+        
+        logger.debug(f"Item agregado a memoria de trabajo - Slots usados: {len(self)}")
+    
+    def _integrate_item(self, seq: int, content: Dict[str, Any], relevance: float):
+        """Actualizar las ventanas del contexto integrado con un item nuevo."""
+        
+        # Extraer pensamientos
+        if 'thoughts' in content or 'previous_thoughts' in content:
+            thoughts = content.get('thoughts', content.get('previous_thoughts', []))
+            self._recent_thoughts.extend((seq, t) for t in thoughts[-3:])  # Últimos 3 pensamientos
+        
+        # Extraer contexto emocional (valores numéricos, ponderados por la relevancia del item)
+        if 'emotional_context' in content:
+            for emotion, value in content['emotional_context'].items():
+                if not isinstance(value, (int, float)):
+                    continue
+                weighted = value * relevance
+                window = self._emotion_max.get(emotion)
+                if window is None:
+                    window = self._emotion_max[emotion] = deque()
+                while window and window[-1][1] <= weighted:
+                    window.pop()
+                window.append((seq, weighted))
+                if window[0][0] <= seq - self.slots:
+                    window.popleft()
         
-        logger.debug(f"Item agregado a memoria de trabajo - Slots usados: {len(self.active_items)}")
+        # Extraer memorias
+        if 'memory_context' in content:
+            self._recent_memories.extend((seq, m) for m in content['memory_context'][-2:])  # Últimas 2
     
     def add_context(self, context: Dict[str, Any]):
         """Agregar contexto adicional al buffer"""
-        context_id = f"context_{len(self.context_buffer)}"
+        context_id = f"context_{self._next_context_id}"
+        self._next_context_id += 1
         self.context_buffer[context_id] = {
             'data': context,
             'timestamp': datetime.now().isoformat()
         }
         
-        # Mantener solo contextos recientes
-        if len(self.context_buffer) > 10:
-            oldest_key = min(self.context_buffer.keys(), 
-                           key=lambda k: self.context_buffer[k]['timestamp'])
-            del self.context_buffer[oldest_key]
+        # Mantener solo contextos recientes (el más antiguo es el primero)
+        while len(self.context_buffer) > self.context_buffer_size:
+            self.context_buffer.popitem(last=False)
     
     def _calculate_relevance(self, item: Dict[str, Any]) -> float:
         """Calcular relevancia de un item para la conciencia"""
@@ -95,72 +229,45 @@ class WorkingMemory:
         
         return min(1.0, relevance)
     
-    def _update_attention_weights(self):
-        """Actualizar pesos de atención para items en memoria de trabajo"""
-        
-        self.attention_weights.clear()
-        
-        total_relevance = sum(item['relevance_score'] for item in self.active_items)
-        
-        if total_relevance > 0:
-            for i, item in enumerate(self.active_items):
-                weight = item['relevance_score'] / total_relevance
-                # Items más recientes tienen ligero boost
-                recency_boost = (i + 1) / len(self.active_items) * 0.1
-                self.attention_weights[i] = weight + recency_boost
-    
     def _create_integrated_context(self) -> Dict[str, Any]:
         """Crear contexto integrado para la red de conciencia"""
         
-        # Consolidar información de memoria de trabajo
-        integrated_thoughts = []
-        integrated_emotions = {}
-        integrated_memories = []
+        # Solo cuentan las entradas de items que siguen en memoria
+        oldest = self._pushed - len(self)
         
-        for i, item in enumerate(self.active_items):
-            content = item['content']
-            weight = self.attention_weights.get(i, 0.1)
-            
-            # Extraer pensamientos
-            if 'thoughts' in content or 'previous_thoughts' in content:
-                thoughts = content.get('thoughts', content.get('previous_thoughts', []))
-                integrated_thoughts.extend(thoughts[-3:])  # Últimos 3 pensamientos
-            
-            # Extraer contexto emocional
-            if 'emotional_context' in content:
-                emotion_data = content['emotional_context']
-                for emotion, value in emotion_data.items():
-                    if emotion in integrated_emotions:
-                        integrated_emotions[emotion] = max(integrated_emotions[emotion], value * weight)
-                    else:
-                        integrated_emotions[emotion] = value * weight
-            
-            # Extraer memorias
-            if 'memory_context' in content:
-                memories = content['memory_context']
-                integrated_memories.extend(memories[-2:])  # Últimas 2 memorias
+        integrated_thoughts = [t for seq, t in self._recent_thoughts if seq >= oldest]
+        integrated_memories = [m for seq, m in self._recent_memories if seq >= oldest]
+        
+        integrated_emotions = {}
+        for emotion in list(self._emotion_max):
+            window = self._emotion_max[emotion]
+            while window and window[0][0] < oldest:
+                window.popleft()
+            if window:
+                integrated_emotions[emotion] = window[0][1]
+            else:
+                del self._emotion_max[emotion]
         
-        # Agregar contexto del buffer
-        buffer_data = []
-        for context_entry in self.context_buffer.values():
-            buffer_data.append(context_entry['data'])
+        # Agregar contexto del buffer (últimos 3, en orden cronológico)
+        buffer_data = [entry['data'] for entry in islice(reversed(self.context_buffer.values()), 3)]
+        buffer_data.reverse()
         
         return {
-            'integrated_thoughts': integrated_thoughts[-5:],  # Máximo 5 pensamientos
+            'integrated_thoughts': integrated_thoughts,  # Máximo 5 pensamientos
             'integrated_emotions': integrated_emotions,
-            'integrated_memories': integrated_memories[-3:],  # Máximo 3 memorias
-            'context_buffer': buffer_data[-3:],  # Últimos 3 contextos
-            'working_memory_load': len(self.active_items) / self.slots,
-            'attention_distribution': self.attention_weights.copy()
+            'integrated_memories': integrated_memories,  # Máximo 3 memorias
+            'context_buffer': buffer_data,  # Últimos 3 contextos
+            'working_memory_load': len(self) / self.slots,
+            'attention_summary': self.attention_summary()  # tamaño fijo, no crece con los slots
         }
     
     def get_working_memory_status(self) -> Dict[str, Any]:
         """Obtener estado actual de la memoria de trabajo"""
         
         return {
-            'slots_used': len(self.active_items),
-            'slots_available': self.slots - len(self.active_items),
-            'memory_load': len(self.active_items) / self.slots,
+            'slots_used': len(self),
+            'slots_available': self.slots - len(self),
+            'memory_load': len(self) / self.slots,
             'oldest_item_age': self._get_oldest_item_age(),
             'average_relevance': self._get_average_relevance(),
             'context_buffer_size': len(self.context_buffer)
@@ -168,10 +275,10 @@ class WorkingMemory:
     
     def _get_oldest_item_age(self) -> float:
         """Obtener edad del item más antiguo en minutos"""
-        if not self.active_items:
+        if not len(self):
             return 0.0
         
-        oldest_timestamp = self.active_items[0]['timestamp']
+        oldest_timestamp = self._items[(self._pushed - len(self)) % self.slots]['timestamp']
         oldest_time = datetime.fromisoformat(oldest_timestamp)
         age_minutes = (datetime.now() - oldest_time).total_seconds() / 60
         
@@ -179,15 +286,19 @@ class WorkingMemory:
     
     def _get_average_relevance(self) -> float:
         """Obtener relevancia promedio de items en memoria"""
-        if not self.active_items:
+        if not len(self):
             return 0.0
         
-        total_relevance = sum(item['relevance_score'] for item in self.active_items)
-        return total_relevance / len(self.active_items)
+        return self._total_relevance / len(self)
     
     def clear_working_memory(self):
         """Limpiar memoria de trabajo"""
-        self.active_items.clear()
-        self.attention_weights.clear()
+        self._items = [None] * self.slots
+        self._relevance.fill(0.0)
+        self._total_relevance = 0.0
+        self._pushed = 0
+        self._recent_thoughts.clear()
+        self._recent_memories.clear()
+        self._emotion_max.clear()
         self.context_buffer.clear()
         logger.info("Memoria de trabajo limpiada")
\ No newline at end of file
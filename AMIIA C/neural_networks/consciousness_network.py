@@ -16,19 +16,37 @@ from tensorflow.keras import layers
 from typing import Dict, List, Any, Tuple
 import logging
 
+from neural_networks.feature_encoder import ContextFeatureEncoder
+
 logger = logging.getLogger("AMIIA-C.ConsciousnessNetwork")
 
+# Modos de ConsciousnessAttention
+ATTENTION_MODES = ('standard', 'fused', 'temporal')
+
 
 class ConsciousnessAttention(layers.Layer):
     """
     Capa de atención especializada para procesamiento consciente
     Permite que la red se enfoque en diferentes aspectos de su estado interno
+
+    Modos:
+    - 'standard': auto-atención sobre la secuencia de entrada (longitud 1 en la red)
+    - 'fused':    con un solo token el softmax vale 1 y la atención es lineal:
+                  x·(Wv·Wo) + (bv·Wo + bo). En inferencia usa esa matriz precalculada
+                  (`refresh_fused_weights` tras cambiar los pesos; ConsciousnessNetwork
+                  lo hace tras entrenar o cargar pesos); al entrenar usa la MHA
+    - 'temporal': la entrada atiende a `context` (estados de conciencia previos) con
+                  `context_mask` marcando las posiciones válidas
     """
     
-    def __init__(self, attention_dim: int, num_heads: int = 8, **kwargs):
+    def __init__(self, attention_dim: int, num_heads: int = 8, mode: str = 'standard', **kwargs):
         super().__init__(**kwargs)
+        if mode not in ATTENTION_MODES:
+            raise ValueError(f"Modo de atención desconocido: {mode} (opciones: {ATTENTION_MODES})")
         self.attention_dim = attention_dim
         self.num_heads = num_heads
+        self.mode = mode
+        self.fused_stale = True
         
         # Capas de atención multi-cabeza para autoconciencia
         self.self_attention = layers.MultiHeadAttention(
@@ -40,10 +58,38 @@ class ConsciousnessAttention(layers.Layer):
         # Normalización y dropout
         self.layer_norm = layers.LayerNormalization()
         self.dropout = layers.Dropout(0.1)
-        
-    def call(self, inputs, training=None):
-        # Auto-atención para conciencia de estado interno
-        attended = self.self_attention(inputs, inputs, training=training)
+    
+    def build(self, input_shape):
+        if self.mode == 'fused':
+            units = input_shape[-1]
+            self.fused_kernel = self.add_weight(
+                name='fused_kernel', shape=(units, units), initializer='zeros', trainable=False
+            )
+            self.fused_bias = self.add_weight(
+                name='fused_bias', shape=(units,), initializer='zeros', trainable=False
+            )
+        super().build(input_shape)
+    
+    def refresh_fused_weights(self):
+        """Recalcular la matriz fusionada desde los pesos de la MHA (ejecución eager)."""
+        # get_weights: query, key, value y attention_output (kernel y bias de cada una)
+        weights = self.self_attention.get_weights()
+        value_kernel, value_bias, output_kernel, output_bias = weights[4:8]
+        self.fused_kernel.assign(np.einsum("dhk,hke->de", value_kernel, output_kernel))
+        self.fused_bias.assign(np.einsum("hk,hke->e", value_bias, output_kernel) + output_bias)
+        self.fused_stale = False
+        
+    def call(self, inputs, context=None, context_mask=None, training=None):
+        if self.mode == 'temporal':
+            # Atención sobre los estados de conciencia previos
+            attended = self.self_attention(
+                inputs, context, attention_mask=context_mask[:, None, :], training=training
+            )
+        elif self.mode == 'fused' and not training:
+            attended = tf.einsum("btd,de->bte", inputs, self.fused_kernel) + self.fused_bias
+        else:
+            # Auto-atención para conciencia de estado interno
+            attended = self.self_attention(inputs, inputs, training=training)
         attended = self.dropout(attended, training=training)
         
         # Conexión residual y normalización
@@ -131,6 +177,11 @@ class ConsciousnessNetwork(keras.Model):
                  consciousness_dim: int = 32,
                  attention_heads: int = 8,
                  metacognition_depth: int = 3,
+                 feature_encoder: ContextFeatureEncoder = None,
+                 compiled_inference: bool = True,
+                 jit_compile: bool = False,
+                 attention_mode: str = 'standard',
+                 attention_window: int = 8,
                  **kwargs):
         super().__init__(**kwargs)
         
@@ -138,6 +189,11 @@ class ConsciousnessNetwork(keras.Model):
         self.consciousness_dim = consciousness_dim
         self.attention_heads = attention_heads
         self.metacognition_depth = metacognition_depth
+        self.attention_mode = attention_mode
+        # Estados de conciencia previos a los que atiende el modo 'temporal'
+        self.attention_window = attention_window
+        # Contexto (dict) -> vector de ancho fijo: la capa de entrada se construye una sola vez
+        self.feature_encoder = feature_encoder or ContextFeatureEncoder()
         
         logger.info(f"Inicializando ConsciousnessNetwork con dimensión {consciousness_dim}")
         
@@ -159,6 +215,7 @@ class ConsciousnessNetwork(keras.Model):
         self.consciousness_attention = ConsciousnessAttention(
             attention_dim=consciousness_dim,
             num_heads=attention_heads,
+            mode=attention_mode,
             name='consciousness_attention'
         )
         
@@ -190,8 +247,28 @@ class ConsciousnessNetwork(keras.Model):
             'attention_patterns': [],
             'coherence_scores': []
         }
+        
+        # Inferencia compilada: firma fija (batch variable, ancho del codificador) para
+        # que tf.function trace una sola vez; jit_compile activa XLA. Las capas se
+        # construyen antes en modo eager, así la traza no crea variables
+        self.compiled_inference = compiled_inference
+        self.jit_compile = jit_compile
+        self._inference_built = False
+        # Paso del optimizador con el que se calculó la atención fusionada
+        self._fused_step = None
+        input_signature = [tf.TensorSpec([None, self.feature_encoder.feature_dim], tf.float32)]
+        if attention_mode == 'temporal':
+            # Ventana de historia de tamaño fijo (con relleno): la firma no cambia entre ciclos
+            input_signature += [tf.TensorSpec([attention_window, consciousness_dim], tf.float32),
+                                tf.TensorSpec([attention_window], tf.bool)]
+        self._compiled_inference = tf.function(
+            self._inference_step,
+            input_signature=input_signature,
+            jit_compile=jit_compile
+        )
     
-    def call(self, inputs, training=None, return_internal_state=False):
+    def call(self, inputs, training=None, return_internal_state=False, update_internal_state=True,
+             history=None, history_mask=None):
         """
         Procesamiento consciente de entrada
         
@@ -199,6 +276,11 @@ class ConsciousnessNetwork(keras.Model):
             inputs: Datos de entrada (contexto, emociones, memorias)
             training: Modo de entrenamiento
             return_internal_state: Si retornar estado interno detallado
+            update_internal_state: Si registrar la salida en el estado interno (requiere
+                                   ejecución eager; la inferencia compilada lo hace fuera del grafo)
+            history, history_mask: Ventana (attention_window, consciousness_dim) de estados
+                                   previos y su máscara, para el modo 'temporal' (por defecto
+                                   se toma de `internal_state`)
             
         Returns:
             Dict con outputs de conciencia, pensamientos, y métricas
@@ -216,8 +298,18 @@ class ConsciousnessNetwork(keras.Model):
                 hidden_activations.append(x)
         
         # 3. Aplicar atención consciente
+        context = context_mask = None
+        if self.attention_mode == 'temporal':
+            if history is None:
+                history, history_mask = self._history_window()
+            # La misma ventana para todas las filas del lote
+            batch_size = tf.shape(x)[0]
+            context = tf.broadcast_to(history[None], [batch_size, self.attention_window, self.consciousness_dim])
+            context_mask = tf.broadcast_to(history_mask[None], [batch_size, self.attention_window])
         attended_x = self.consciousness_attention(
             tf.expand_dims(x, axis=1), 
+            context=context,
+            context_mask=context_mask,
             training=training
         )
         attended_x = tf.squeeze(attended_x, axis=1)
@@ -250,7 +342,7 @@ class ConsciousnessNetwork(keras.Model):
         coherence_level = self.coherence_output(consciousness_state, training=training)
         
         # 7. Actualizar estado interno
-        if not training:
+        if not training and update_internal_state:
             self._update_internal_state(
                 consciousness_state.numpy() if hasattr(consciousness_state, 'numpy') else consciousness_state,
                 metacognition_outputs,
@@ -277,32 +369,23 @@ class ConsciousnessNetwork(keras.Model):
         """
         Método de conveniencia para llamada simple
         Compatible con el main.py
+
+        Los contextos (dict) pasan por `feature_encoder`, así que la entrada tiene
+        siempre ancho `feature_encoder.feature_dim`.
         """
         try:
-            # Asegurar que inputs sea un tensor
             if isinstance(inputs, dict):
-                # Convertir dict a tensor concatenando valores
-                tensor_inputs = []
-                for key in sorted(inputs.keys()):
-                    value = inputs[key]
-                    if isinstance(value, (list, np.ndarray)):
-                        tensor_inputs.extend(np.atleast_1d(value).flatten())
-                    elif isinstance(value, (int, float)):
-                        tensor_inputs.append(value)
-                    elif isinstance(value, str):
-                        # Encoding simple para strings (mejor usar embeddings reales)
-                        tensor_inputs.extend([ord(c) / 255.0 for c in value[:10]])
-                
-                inputs = tf.constant([tensor_inputs], dtype=tf.float32)
+                inputs = tf.constant(self.feature_encoder.encode(inputs)[None, :])
             elif not isinstance(inputs, tf.Tensor):
-                inputs = tf.constant([[0.5] * 100], dtype=tf.float32)  # Default fallback
+                inputs = tf.constant(np.asarray(inputs, dtype=np.float32))
             
             # Asegurar dimensiones correctas
             if len(inputs.shape) == 1:
                 inputs = tf.expand_dims(inputs, 0)
             
             # Procesar y retornar resultado simplificado
-            outputs = self.call(inputs, training=False)
+            outputs = self.infer(inputs)
+            self._record_outputs(outputs)
             return outputs['consciousness_state']
             
         except Exception as e:
@@ -310,6 +393,114 @@ class ConsciousnessNetwork(keras.Model):
             # Retornar estado de conciencia por defecto
             return tf.constant([[0.5] * self.consciousness_dim], dtype=tf.float32)
     
+    def forward_batch(self, contexts: List[Dict[str, Any]]):
+        """Estados de conciencia (n, consciousness_dim) para varios contextos en una sola pasada."""
+        features = self.feature_encoder.encode_batch(contexts)
+        outputs = self.infer(tf.constant(features))
+        self._record_outputs(outputs)
+        return outputs['consciousness_state']
+    
+    def infer(self, inputs) -> Dict[str, Any]:
+        """
+        Inferencia sin efectos sobre el estado interno: grafo compilado si
+        `compiled_inference`, si no `call` en modo eager.
+        """
+        extra_args = ()
+        if self.attention_mode == 'temporal':
+            history, history_mask = self._history_window()
+            extra_args = (tf.constant(history), tf.constant(history_mask))
+        if not self._inference_built:
+            # Primera pasada eager con un lote de ceros: crea todas las variables
+            self._inference_step(tf.zeros((1, self.feature_encoder.feature_dim)), *extra_args)
+            self._inference_built = True
+        if self.attention_mode == 'fused' and self._fused_attention_stale():
+            self.refresh_fused_attention()
+        args = (inputs,) + extra_args
+        if self.compiled_inference:
+            return self._compiled_inference(*args)
+        return self._inference_step(*args)
+    
+    def refresh_fused_attention(self):
+        """
+        Recalcular la atención fusionada (modo 'fused') a partir de los pesos actuales.
+        `infer` lo hace la primera vez, tras cada paso del optimizador del modelo
+        (`fit`, `train_step`, `optimizer.apply_gradients`) y tras `set_weights` /
+        `load_weights`; llamarlo a mano solo si se asignan variables directamente o
+        se entrena con otro optimizador.
+        """
+        attention = self.consciousness_attention
+        if not attention.built or not attention.self_attention.built:
+            # Construir la MHA y las variables fusionadas con una pasada por la ruta estándar
+            attention(tf.zeros((1, 1, self.hidden_layers[-1])), training=True)
+        attention.refresh_fused_weights()
+        self._fused_step = self._optimizer_step()
+    
+    def set_weights(self, weights):
+        super().set_weights(weights)
+        self.consciousness_attention.fused_stale = True
+    
+    def load_weights(self, *args, **kwargs):
+        result = super().load_weights(*args, **kwargs)
+        self.consciousness_attention.fused_stale = True
+        return result
+    
+    def _fused_attention_stale(self) -> bool:
+        """Si los pesos de la MHA pueden haber cambiado desde el último cálculo fusionado."""
+        return self.consciousness_attention.fused_stale or self._fused_step != self._optimizer_step()
+    
+    def _optimizer_step(self) -> int:
+        optimizer = getattr(self, 'optimizer', None)
+        return int(np.asarray(optimizer.iterations)) if optimizer is not None else 0
+    
+    def _history_window(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Últimos `attention_window` estados de conciencia, con relleno al final y su
+        máscara. Sin historia se usa un estado nulo válido, para que el softmax
+        nunca quede sin claves.
+        """
+        window = np.zeros((self.attention_window, self.consciousness_dim), dtype=np.float32)
+        mask = np.zeros(self.attention_window, dtype=bool)
+        recent = self.internal_state['consciousness_history'][-self.attention_window:]
+        if recent:
+            states = np.concatenate([np.reshape(state, (-1, self.consciousness_dim)) for state in recent])
+            states = states[-self.attention_window:]
+            window[:len(states)] = states
+            mask[:len(states)] = True
+        else:
+            mask[0] = True
+        return window, mask
+    
+    def _inference_step(self, inputs, history=None, history_mask=None):
+        outputs = self.call(inputs, training=False, update_internal_state=False,
+                            history=history, history_mask=history_mask)
+        return {
+            'consciousness_state': outputs['consciousness_state'],
+            'thought_stream': outputs['thought_stream'],
+            'awareness_level': outputs['awareness_level'],
+            'coherence_level': outputs['coherence_level'],
+            'metacognition_outputs': outputs['metacognition_outputs'],
+        }
+    
+    def _record_outputs(self, outputs: Dict[str, Any]):
+        """Registrar una inferencia en el estado interno, una fila del lote a la vez."""
+        # Una sola copia al host por tensor, fuera del grafo
+        state = outputs['consciousness_state'].numpy()
+        coherence = outputs['coherence_level'].numpy()
+        awareness = outputs['awareness_level'].numpy()
+        metacognition = [meta.numpy() for meta in outputs['metacognition_outputs']]
+        for row in range(state.shape[0]):
+            self._update_internal_state(
+                state[row:row + 1],
+                [meta[row:row + 1] for meta in metacognition],
+                awareness[row],
+                coherence[row]
+            )
+    
+    def export_numpy_weights(self, filepath: str) -> Dict[str, Any]:
+        """Exportar los pesos a .npz para servir con NumpyConsciousnessRuntime (sin TensorFlow)"""
+        from neural_networks.numpy_runtime import export_weights
+        return export_weights(self, filepath)
+    
     def _update_internal_state(self, consciousness_state, metacognition_outputs, 
                              awareness_level, coherence_level):
         """Actualizar estado interno de la red neuronal"""
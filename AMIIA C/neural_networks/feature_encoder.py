@@ -0,0 +1,121 @@
+"""
+Codificador de características de contexto - AMIIA-C
+Convierte el contexto de trabajo (dict) en un vector de ancho fijo para ConsciousnessNetwork
+"""
+
+import re
+import zlib
+from typing import Dict, List, Any, Iterable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.FeatureEncoder")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Características escalares, en este orden, al final del vector
+SCALAR_FEATURES = (
+    "working_memory_load",
+    "thought_count",
+    "memory_count",
+    "context_buffer_count",
+    "semantic_context_count",
+    "emotion_count",
+    "emotion_peak",
+    "attention_peak",
+)
+
+
+class ContextFeatureEncoder:
+    """
+    Codificador determinista de ancho fijo (solo NumPy):
+
+    - pensamientos:  bolsa de tokens con hashing (crc32 con signo), normalizada L2
+                     (`integrated_thoughts` y `previous_thoughts`)
+    - texto externo: igual, sobre entradas del usuario (buffer y `user_input`) y
+                     contexto semántico
+    - emociones:     cada clave de `integrated_emotions` a un bucket por crc32 (máximo por bucket)
+    - escalares:     carga de memoria de trabajo, conteos y picos (ver SCALAR_FEATURES)
+
+    crc32 es estable entre procesos (a diferencia de `hash()`), así que el mismo
+    contexto produce siempre el mismo vector.
+    """
+
+    def __init__(self, text_dim: int = 64, emotion_dim: int = 16):
+        self.text_dim = text_dim
+        self.emotion_dim = emotion_dim
+        self.feature_dim = 2 * text_dim + emotion_dim + len(SCALAR_FEATURES)
+
+    def encode(self, context: Dict[str, Any]) -> np.ndarray:
+        """Vector (feature_dim,) float32 para un contexto."""
+        features = np.zeros(self.feature_dim, dtype=np.float32)
+        self._encode_into(context, features)
+        return features
+
+    def encode_batch(self, contexts: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """Matriz (n, feature_dim) float32 para varios contextos."""
+        contexts = list(contexts)
+        features = np.zeros((len(contexts), self.feature_dim), dtype=np.float32)
+        for row, context in zip(features, contexts):
+            self._encode_into(context, row)
+        return features
+
+    # Internos
+
+    def _encode_into(self, context: Dict[str, Any], out: np.ndarray):
+        thoughts = self._strings(context.get("integrated_thoughts"))
+        buffer_inputs = self._strings([
+            entry.get("user_input") for entry in context.get("context_buffer") or ()
+            if isinstance(entry, dict)
+        ])
+        semantic = self._strings(context.get("semantic_context"))
+
+        text_dim = self.text_dim
+        self._hash_text(thoughts + self._strings(context.get("previous_thoughts")), out[:text_dim])
+        self._hash_text(buffer_inputs + semantic + self._strings(context.get("user_input")),
+                        out[text_dim:2 * text_dim])
+
+        emotions = {
+            key: float(value) for key, value in (context.get("integrated_emotions") or {}).items()
+            if isinstance(value, (int, float))
+        }
+        emotion_block = out[2 * text_dim:2 * text_dim + self.emotion_dim]
+        for key, value in emotions.items():
+            bucket = zlib.crc32(str(key).encode("utf-8")) % self.emotion_dim
+            emotion_block[bucket] = max(emotion_block[bucket], value)
+
+        attention_peak = float((context.get("attention_summary") or {}).get("peak", 0.0))
+
+        # Conteos en escala log para mantenerlos en un rango comparable
+        out[2 * text_dim + self.emotion_dim:] = (
+            float(context.get("working_memory_load", 0.0) or 0.0),
+            np.log1p(len(thoughts)),
+            np.log1p(len(context.get("integrated_memories") or ())),
+            np.log1p(len(buffer_inputs)),
+            np.log1p(len(semantic)),
+            np.log1p(len(emotions)),
+            max(emotions.values(), default=0.0),
+            attention_peak,
+        )
+
+    def _hash_text(self, texts: List[str], out: np.ndarray):
+        tokens = [token for text in texts for token in _TOKEN_PATTERN.findall(text.lower())]
+        if not tokens:
+            return
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                             dtype=np.uint32, count=len(tokens))
+        # Bit alto como signo: colisiones se cancelan en promedio en lugar de acumularse
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+        out += np.bincount(hashes % out.shape[0], weights=signs, minlength=out.shape[0])
+        norm = np.linalg.norm(out)
+        if norm > 0:
+            out /= norm
+
+    @staticmethod
+    def _strings(values: Any) -> List[str]:
+        if not values:
+            return []
+        if isinstance(values, str):
+            return [values]
+        return [value for value in values if isinstance(value, str)]
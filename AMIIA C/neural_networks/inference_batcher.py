@@ -0,0 +1,149 @@
+"""
+Micro-batching de inferencia - AMIIA-C
+Agrupa las llamadas concurrentes a ConsciousnessNetwork en una sola pasada por lote
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("AMIIA-C.InferenceBatcher")
+
+# Latencias recientes que se conservan para las métricas
+_LATENCY_WINDOW = 1000
+
+
+class InferenceBatcher:
+    """
+    Planificador asyncio delante de `network.forward_batch`:
+
+    - cada ciclo espera su resultado con `await batcher.forward(context)`
+    - un único worker junta peticiones hasta `max_batch_size` o hasta que la más
+      antigua lleva `max_wait_ms` esperando, y ejecuta el lote en `executor`
+      (por defecto un hilo propio, para no bloquear el bucle de eventos)
+    - los resultados se reparten por fila a las peticiones del lote
+
+    Los lotes se ejecutan de uno en uno: el estado interno de la red no se toca
+    desde dos hilos a la vez. Tras `close()` no se admiten más peticiones.
+    """
+
+    def __init__(self, network, max_batch_size: int = 16, max_wait_ms: float = 2.0,
+                 executor: Optional[Executor] = None):
+        self.network = network
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="amiia-inference")
+        self._owns_executor = executor is None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # Métricas
+        self._requests = 0
+        self._batches = 0
+        self._failed_batches = 0
+        self._busy_time = 0.0
+        self._queue_latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._total_latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._batch_sizes = deque(maxlen=_LATENCY_WINDOW)
+
+    async def forward(self, context: Dict[str, Any]) -> np.ndarray:
+        """Estado de conciencia (1, consciousness_dim) para un contexto."""
+        if self._closed:
+            raise RuntimeError("InferenceBatcher cerrado: no admite más peticiones")
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((context, future, time.perf_counter()))
+        return await future
+
+    async def close(self):
+        """Atender las peticiones pendientes y detener el worker."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Rendimiento y latencias (ms) del batcher."""
+        def percentile(values, q):
+            return float(np.percentile(values, q)) * 1000.0 if values else 0.0
+
+        return {
+            'requests': self._requests,
+            'batches': self._batches,
+            'failed_batches': self._failed_batches,
+            'average_batch_size': float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+            # Peticiones por segundo de inferencia efectiva (sin contar tiempo ocioso)
+            'throughput_per_second': self._requests / self._busy_time if self._busy_time else 0.0,
+            'queue_latency_p50_ms': percentile(self._queue_latencies, 50),
+            'queue_latency_p95_ms': percentile(self._queue_latencies, 95),
+            'latency_p50_ms': percentile(self._total_latencies, 50),
+            'latency_p95_ms': percentile(self._total_latencies, 95),
+        }
+
+    # Internos
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._run_batch(loop, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, loop, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        started = time.perf_counter()
+        contexts = [context for context, _, _ in batch]
+        try:
+            states = await loop.run_in_executor(self._executor, self._forward_batch, contexts)
+        except Exception as e:
+            # Como forward: los ciclos siguen con el estado por defecto
+            logger.warning(f"Error en lote de inferencia ({len(batch)}): {e}. Usando estado por defecto.")
+            self._failed_batches += 1
+            states = np.full((len(batch), self.network.consciousness_dim), 0.5, dtype=np.float32)
+        finished = time.perf_counter()
+
+        self._requests += len(batch)
+        self._batches += 1
+        self._busy_time += finished - started
+        self._batch_sizes.append(len(batch))
+        for row, (_, future, enqueued) in enumerate(batch):
+            self._queue_latencies.append(started - enqueued)
+            self._total_latencies.append(finished - enqueued)
+            if not future.done():
+                future.set_result(states[row:row + 1])
+
+    def _forward_batch(self, contexts: List[Dict[str, Any]]) -> np.ndarray:
+        return np.asarray(self.network.forward_batch(contexts))
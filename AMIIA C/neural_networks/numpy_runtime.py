@@ -0,0 +1,457 @@
+"""
+Runtime NumPy de ConsciousnessNetwork - AMIIA-C
+Inferencia sin TensorFlow a partir de pesos exportados a .npz
+
+Los workers que solo sirven inferencia cargan este módulo (NumPy únicamente) en
+lugar de neural_networks.consciousness_network, que importa TensorFlow y Keras.
+"""
+
+import json
+import os
+from collections import deque
+from typing import Dict, List, Any
+import logging
+
+import numpy as np
+
+from neural_networks.feature_encoder import ContextFeatureEncoder
+
+logger = logging.getLogger("AMIIA-C.NumpyRuntime")
+
+# Clave del .npz con la configuración de la red (JSON)
+_CONFIG_KEY = "__config__"
+
+# Modos de atención (como ConsciousnessAttention)
+ATTENTION_MODES = ('standard', 'fused', 'temporal')
+
+# Formatos de almacenamiento de los kernels
+QUANTIZATION_MODES = ("int8", "float16")
+
+# Ejes de entrada de cada kernel (se reducen al calcular la escala por canal de salida);
+# por defecto el eje 0, como en Dense
+_KERNEL_INPUT_AXES = {"attention/output/kernel": (0, 1)}
+
+
+def export_weights(network, path: str) -> Dict[str, Any]:
+    """
+    Volcar los pesos de una ConsciousnessNetwork (Keras) a un .npz que entiende
+    NumpyConsciousnessRuntime. Devuelve la configuración guardada.
+    """
+    if not network.built:
+        # Construir las capas con una pasada de ceros
+        network.infer(np.zeros((1, network.feature_encoder.feature_dim), dtype=np.float32))
+
+    weights: Dict[str, np.ndarray] = {}
+
+    def dense(name, layer):
+        weights[f"{name}/kernel"], weights[f"{name}/bias"] = layer.get_weights()
+
+    def norm(name, layer):
+        weights[f"{name}/gamma"], weights[f"{name}/beta"] = layer.get_weights()
+
+    dense("input_processor", network.input_processor)
+    norm("input_norm", network.input_norm)
+    hidden = [layer for layer in network.hidden_processors if 'hidden_' in layer.name]
+    for i, layer in enumerate(hidden, 1):
+        dense(f"hidden_{i}", layer)
+
+    # MultiHeadAttention: query, key, value y attention_output, en orden de construcción
+    attention = network.consciousness_attention
+    mha_weights = attention.self_attention.get_weights()
+    for i, part in enumerate(("query", "key", "value", "output")):
+        weights[f"attention/{part}/kernel"] = mha_weights[2 * i]
+        weights[f"attention/{part}/bias"] = mha_weights[2 * i + 1]
+    norm("attention/norm", attention.layer_norm)
+
+    for i, meta in enumerate(network.metacognition_layers, 1):
+        dense(f"metacognition_{i}/dense_1", meta.meta_dense_1)
+        dense(f"metacognition_{i}/dense_2", meta.meta_dense_2)
+        dense(f"metacognition_{i}/output", meta.meta_output)
+        dense(f"metacognition_{i}/introspection", meta.introspection)
+
+    integration = network.consciousness_integration
+    dense("integration/thought", integration.thought_integration)
+    dense("integration/emotion", integration.emotion_integration)
+    dense("integration/memory", integration.memory_integration)
+    dense("integration/synthesis", integration.consciousness_synthesis)
+
+    dense("thought_output", network.thought_output)
+    dense("awareness_output", network.awareness_output)
+    dense("coherence_output", network.coherence_output)
+
+    config = {
+        'hidden_layers': list(network.hidden_layers),
+        'consciousness_dim': network.consciousness_dim,
+        'attention_heads': network.attention_heads,
+        'metacognition_depth': network.metacognition_depth,
+        'text_dim': network.feature_encoder.text_dim,
+        'emotion_dim': network.feature_encoder.emotion_dim,
+        'input_norm_epsilon': float(network.input_norm.epsilon),
+        'attention_norm_epsilon': float(attention.layer_norm.epsilon),
+        'attention_mode': network.attention_mode,
+        'attention_window': network.attention_window,
+    }
+
+    save_weights(path, {name: np.asarray(value, dtype=np.float32) for name, value in weights.items()}, config)
+    logger.info(f"Pesos de ConsciousnessNetwork exportados a {path} ({len(weights)} tensores)")
+    return config
+
+
+def save_weights(path: str, weights: Dict[str, np.ndarray], config: Dict[str, Any]):
+    """Guardar pesos (float32 o cuantizados) y configuración en un .npz."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez(path, **weights, **{_CONFIG_KEY: np.array(json.dumps(config))})
+
+
+def quantize_weights(weights: Dict[str, np.ndarray], mode: str) -> Dict[str, np.ndarray]:
+    """
+    Cuantización post-entrenamiento de los kernels (bias y LayerNorm siguen en float32):
+
+    - "int8":    simétrica por canal de salida; `<capa>/kernel` pasa a int8 y se añade
+                 `<capa>/kernel_scale` (float32, con las dimensiones reducidas a 1)
+    - "float16": `<capa>/kernel` se guarda en float16
+
+    El runtime acumula siempre en float32.
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Modo de cuantización desconocido: {mode} (opciones: {QUANTIZATION_MODES})")
+
+    quantized = {}
+    for name, value in weights.items():
+        if not name.endswith("/kernel") or value.dtype != np.float32:
+            quantized[name] = value
+        elif mode == "float16":
+            quantized[name] = value.astype(np.float16)
+        else:
+            axes = _KERNEL_INPUT_AXES.get(name, (0,))
+            scale = np.abs(value).max(axis=axes, keepdims=True) / 127.0
+            scale[scale == 0] = 1.0
+            quantized[name] = np.clip(np.rint(value / scale), -127, 127).astype(np.int8)
+            quantized[f"{name}_scale"] = scale.astype(np.float32)
+    return quantized
+
+
+def quantization_report(reference: "NumpyConsciousnessRuntime", quantized: "NumpyConsciousnessRuntime",
+                        inputs: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    Error de un runtime cuantizado frente al de referencia (float32) sobre `inputs`:
+    error absoluto máximo y medio por salida.
+    """
+    expected = reference.call(inputs)
+    actual = quantized.call(inputs)
+    report = {}
+    for key in ('awareness_level', 'coherence_level', 'consciousness_state', 'thought_stream'):
+        error = np.abs(expected[key] - actual[key])
+        report[key] = {'max_abs_error': float(error.max()), 'mean_abs_error': float(error.mean())}
+    return report
+
+
+def validate_runtime(network, runtime: "NumpyConsciousnessRuntime", inputs: np.ndarray,
+                     atol: float = 1e-4) -> Dict[str, Any]:
+    """
+    Comparar la inferencia de la red TensorFlow y del runtime NumPy sobre `inputs`
+    (n, feature_dim). Devuelve el error absoluto máximo por salida y si todas
+    quedan dentro de `atol`. En modo 'temporal' ambos deben partir del mismo
+    historial de estados (p.ej. recién creados).
+    """
+    inputs = np.asarray(inputs, dtype=np.float32)
+    expected = network.infer(inputs)
+    actual = runtime.call(inputs)
+
+    errors = {}
+    for key in ('consciousness_state', 'thought_stream', 'awareness_level', 'coherence_level'):
+        errors[key] = float(np.max(np.abs(np.asarray(expected[key]) - actual[key])))
+    for i, (tf_meta, np_meta) in enumerate(zip(expected['metacognition_outputs'],
+                                               actual['metacognition_outputs']), 1):
+        errors[f'metacognition_{i}'] = float(np.max(np.abs(np.asarray(tf_meta) - np_meta)))
+
+    return {
+        'max_abs_error': errors,
+        'atol': atol,
+        'passed': all(error <= atol for error in errors.values())
+    }
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+class NumpyConsciousnessRuntime:
+    """
+    Reproduce `ConsciousnessNetwork.call` en modo inferencia (dropout desactivado)
+    con los pesos de `export_weights`:
+
+    entrada -> Dense+LayerNorm -> Dense ocultas -> atención multi-cabeza + residual
+    + LayerNorm -> niveles de metacognición -> integración -> salidas
+
+    Expone la interfaz que usa el resto del sistema (forward, forward_batch,
+    internal_state, get_consciousness_metrics), así que puede sustituir a la red
+    en main.py y en InferenceBatcher.
+
+    Acepta kernels cuantizados (ver `quantize_weights`): se convierten a float32
+    en cada capa, de modo que en memoria solo viven en int8/float16.
+
+    Modos de atención (`attention_mode` en la configuración exportada):
+    - 'standard': MHA sobre un token, como la red
+    - 'fused':    una sola matriz precalculada Wv·Wo (el softmax sobre una clave vale 1)
+    - 'temporal': atención a los últimos `attention_window` estados de conciencia; las
+                  proyecciones K/V de cada estado se calculan una vez, al registrarlo
+    """
+
+    def __init__(self, weights: Dict[str, np.ndarray], config: Dict[str, Any]):
+        # Los kernels conservan su formato (float32, float16 o int8); el resto va en float32
+        self.weights = {
+            name: value if name.endswith("/kernel") and value.dtype in (np.int8, np.float16)
+            else np.asarray(value, dtype=np.float32)
+            for name, value in weights.items()
+        }
+        self.config = dict(config)
+        self.hidden_layers = list(config['hidden_layers'])
+        self.consciousness_dim = config['consciousness_dim']
+        self.attention_heads = config['attention_heads']
+        self.metacognition_depth = config['metacognition_depth']
+        self.input_norm_epsilon = config.get('input_norm_epsilon', 1e-3)
+        self.attention_norm_epsilon = config.get('attention_norm_epsilon', 1e-3)
+        self.feature_encoder = ContextFeatureEncoder(
+            text_dim=config.get('text_dim', 64), emotion_dim=config.get('emotion_dim', 16)
+        )
+        self.attention_mode = config.get('attention_mode', 'standard')
+        self.attention_window = config.get('attention_window', 8)
+        if self.attention_mode not in ATTENTION_MODES:
+            raise ValueError(f"Modo de atención desconocido: {self.attention_mode} (opciones: {ATTENTION_MODES})")
+
+        expected_inputs = self.feature_encoder.feature_dim
+        actual_inputs = self.weights["input_processor/kernel"].shape[0]
+        if actual_inputs != expected_inputs:
+            raise ValueError(
+                f"Los pesos esperan {actual_inputs} características y el codificador produce {expected_inputs}"
+            )
+
+        # Estado interno, como en ConsciousnessNetwork
+        self.internal_state = {
+            'consciousness_history': [],
+            'metacognition_traces': [],
+            'attention_patterns': [],
+            'coherence_scores': []
+        }
+
+        # Caché K/V del modo 'temporal': (k, v) de cada estado reciente, (heads, key_dim)
+        self._kv_cache = deque(maxlen=self.attention_window)
+        if self.attention_mode == 'fused':
+            self.refresh_fused_attention()
+
+        logger.info(f"Runtime NumPy inicializado con dimensión {self.consciousness_dim}")
+
+    @classmethod
+    def load(cls, path: str, quantization: str = None) -> "NumpyConsciousnessRuntime":
+        """
+        Cargar un runtime desde un .npz generado con `export_weights` (o ya cuantizado
+        con `quantize_weights` + `save_weights`). `quantization` ("int8"/"float16")
+        cuantiza al cargar los kernels que sigan en float32.
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data[_CONFIG_KEY]))
+            weights = {name: data[name] for name in data.files if name != _CONFIG_KEY}
+        if quantization:
+            weights = quantize_weights(weights, quantization)
+        return cls(weights, config)
+
+    def get_memory_usage(self) -> int:
+        """Bytes ocupados por los pesos."""
+        return int(sum(value.nbytes for value in self.weights.values()))
+
+    def call(self, inputs: np.ndarray) -> Dict[str, Any]:
+        """Inferencia sobre un lote (n, feature_dim); mismas salidas que `ConsciousnessNetwork.infer`."""
+        x = np.asarray(inputs, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None, :]
+
+        # 1. Procesamiento inicial de entrada
+        x = self._layer_norm("input_norm", _relu(self._dense("input_processor", x)),
+                             self.input_norm_epsilon)
+
+        # 2. Capas ocultas (dropout es la identidad en inferencia)
+        for i in range(1, len(self.hidden_layers)):
+            x = _relu(self._dense(f"hidden_{i}", x))
+
+        # 3. Atención consciente
+        if self.attention_mode == 'fused':
+            attended = x @ self._fused_kernel + self._fused_bias
+        elif self.attention_mode == 'temporal':
+            attended = self._temporal_attention(x)
+        else:
+            # Secuencia de longitud 1
+            attended = self._attention(x[:, None, :], x[:, None, :])[:, 0, :]
+        attended = self._layer_norm("attention/norm", x + attended, self.attention_norm_epsilon)
+
+        # 4. Metacognición en múltiples niveles
+        metacognition_outputs = []
+        introspection_levels = []
+        current_meta = attended
+        for i in range(1, self.metacognition_depth + 1):
+            meta = _relu(self._dense(f"metacognition_{i}/dense_1", current_meta))
+            meta = _relu(self._dense(f"metacognition_{i}/dense_2", meta))
+            meta = np.tanh(self._dense(f"metacognition_{i}/output", meta))
+            metacognition_outputs.append(meta)
+            introspection_levels.append(_sigmoid(self._dense(f"metacognition_{i}/introspection", meta)))
+            current_meta = meta
+
+        # 5. Integración (los tres streams son el mismo, como en la red)
+        final_metacognition = metacognition_outputs[-1] if metacognition_outputs else attended
+        combined = np.concatenate([
+            _relu(self._dense("integration/thought", final_metacognition)),
+            _relu(self._dense("integration/emotion", final_metacognition)),
+            _relu(self._dense("integration/memory", final_metacognition)),
+        ], axis=-1)
+        consciousness_state = np.tanh(self._dense("integration/synthesis", combined))
+
+        # 6. Salidas especializadas
+        return {
+            'consciousness_state': consciousness_state,
+            'thought_stream': np.tanh(self._dense("thought_output", consciousness_state)),
+            'awareness_level': _sigmoid(self._dense("awareness_output", consciousness_state)),
+            'coherence_level': _sigmoid(self._dense("coherence_output", consciousness_state)),
+            'metacognition_outputs': metacognition_outputs,
+            'introspection_levels': introspection_levels
+        }
+
+    def forward(self, inputs) -> np.ndarray:
+        """Estado de conciencia (1, consciousness_dim) para un contexto (dict) o un vector."""
+        try:
+            if isinstance(inputs, dict):
+                inputs = self.feature_encoder.encode(inputs)
+            outputs = self.call(inputs)
+            self._record_outputs(outputs)
+            return outputs['consciousness_state']
+        except Exception as e:
+            logger.warning(f"Error en forward: {e}. Usando estado por defecto.")
+            return np.full((1, self.consciousness_dim), 0.5, dtype=np.float32)
+
+    def forward_batch(self, contexts: List[Dict[str, Any]]) -> np.ndarray:
+        """Estados de conciencia (n, consciousness_dim) para varios contextos en una sola pasada."""
+        outputs = self.call(self.feature_encoder.encode_batch(contexts))
+        self._record_outputs(outputs)
+        return outputs['consciousness_state']
+
+    def get_consciousness_metrics(self) -> Dict[str, float]:
+        """Obtener métricas actuales de conciencia"""
+        coherence_scores = self.internal_state['coherence_scores']
+        if not coherence_scores:
+            return {
+                'average_coherence': 0.0,
+                'consciousness_stability': 0.0,
+                'metacognition_depth': 0.0,
+                'processing_cycles': 0
+            }
+        return {
+            'average_coherence': np.mean(coherence_scores),
+            'consciousness_stability': 1.0 - np.std(coherence_scores),
+            'metacognition_depth': self.metacognition_depth,
+            'processing_cycles': len(self.internal_state['consciousness_history'])
+        }
+
+    def reset_internal_state(self):
+        """Reiniciar estado interno del runtime"""
+        for value in self.internal_state.values():
+            value.clear()
+        self._kv_cache.clear()
+
+    def refresh_fused_attention(self):
+        """Recalcular la atención fusionada (modo 'fused') desde los pesos de la MHA."""
+        output_kernel = self._kernel("attention/output")
+        self._fused_kernel = np.einsum("dhk,hke->de", self._kernel("attention/value"), output_kernel)
+        self._fused_bias = (np.einsum("hk,hke->e", self.weights["attention/value/bias"], output_kernel)
+                            + self.weights["attention/output/bias"])
+
+    # Internos
+
+    def _dense(self, name: str, x: np.ndarray) -> np.ndarray:
+        kernel = self.weights[f"{name}/kernel"]
+        if kernel.dtype == np.float32:
+            return x @ kernel + self.weights[f"{name}/bias"]
+        # Escala por canal de salida aplicada después del producto (float32)
+        y = x @ kernel.astype(np.float32)
+        scale = self.weights.get(f"{name}/kernel_scale")
+        if scale is not None:
+            y *= scale
+        return y + self.weights[f"{name}/bias"]
+
+    def _kernel(self, name: str) -> np.ndarray:
+        """Kernel en float32 (desempaquetado si está cuantizado)."""
+        kernel = self.weights[f"{name}/kernel"]
+        if kernel.dtype == np.float32:
+            return kernel
+        scale = self.weights.get(f"{name}/kernel_scale")
+        return kernel.astype(np.float32) * scale if scale is not None else kernel.astype(np.float32)
+
+    def _layer_norm(self, name: str, x: np.ndarray, epsilon: float) -> np.ndarray:
+        mean = x.mean(axis=-1, keepdims=True)
+        variance = x.var(axis=-1, keepdims=True)
+        normalized = (x - mean) / np.sqrt(variance + epsilon)
+        return normalized * self.weights[f"{name}/gamma"] + self.weights[f"{name}/beta"]
+
+    def _attention(self, query: np.ndarray, value: np.ndarray) -> np.ndarray:
+        """MultiHeadAttention de Keras: (n, T, d) x (n, S, d) -> (n, T, d)."""
+        w = self.weights
+        key_dim = w["attention/query/kernel"].shape[-1]
+        q = np.einsum("btd,dhk->bthk", query, self._kernel("attention/query")) + w["attention/query/bias"]
+        k = np.einsum("bsd,dhk->bshk", value, self._kernel("attention/key")) + w["attention/key/bias"]
+        v = np.einsum("bsd,dhk->bshk", value, self._kernel("attention/value")) + w["attention/value/bias"]
+        scores = np.einsum("bthk,bshk->bhts", q * np.float32(1.0 / np.sqrt(key_dim)), k)
+        context = np.einsum("bhts,bshk->bthk", _softmax(scores), v)
+        return np.einsum("bthk,hkd->btd", context, self._kernel("attention/output")) + w["attention/output/bias"]
+
+    def _temporal_attention(self, x: np.ndarray) -> np.ndarray:
+        """Atención de (n, d) a los estados en caché; todas las filas comparten la ventana."""
+        w = self.weights
+        if self._kv_cache:
+            keys = np.stack([k for k, _ in self._kv_cache])
+            values = np.stack([v for _, v in self._kv_cache])
+        else:
+            # Sin historia: un estado nulo, cuya proyección es solo el bias (como la red)
+            keys = w["attention/key/bias"][None]
+            values = w["attention/value/bias"][None]
+        key_dim = keys.shape[-1]
+        q = np.einsum("bd,dhk->bhk", x, self._kernel("attention/query")) + w["attention/query/bias"]
+        scores = np.einsum("bhk,shk->bhs", q * np.float32(1.0 / np.sqrt(key_dim)), keys)
+        context = np.einsum("bhs,shk->bhk", _softmax(scores), values)
+        return np.einsum("bhk,hkd->bd", context, self._kernel("attention/output")) + w["attention/output/bias"]
+
+    def _record_outputs(self, outputs: Dict[str, Any]):
+        state = outputs['consciousness_state']
+        if self.attention_mode == 'temporal':
+            # Proyectar K/V de los nuevos estados una sola vez
+            w = self.weights
+            keys = np.einsum("bc,chk->bhk", state, self._kernel("attention/key")) + w["attention/key/bias"]
+            values = np.einsum("bc,chk->bhk", state, self._kernel("attention/value")) + w["attention/value/bias"]
+            self._kv_cache.extend(zip(keys, values))
+        for row in range(state.shape[0]):
+            self._update_internal_state(
+                state[row:row + 1],
+                [meta[row:row + 1] for meta in outputs['metacognition_outputs']],
+                float(outputs['coherence_level'][row, 0])
+            )
+
+    def _update_internal_state(self, consciousness_state: np.ndarray,
+                               metacognition_outputs: List[np.ndarray], coherence_level: float):
+        # Mismos límites que ConsciousnessNetwork._update_internal_state
+        for key, value, limit in (('consciousness_history', consciousness_state, 50),
+                                  ('metacognition_traces', metacognition_outputs, 20),
+                                  ('coherence_scores', coherence_level, 100)):
+            history = self.internal_state[key]
+            history.append(value)
+            if len(history) > limit:
+                del history[:-limit]
@@ -0,0 +1,106 @@
+"""
+Pruebas de ConsciousnessNetwork - AMIIA-C
+Inferencia compilada con tf.function (una sola traza por firma) frente a la
+ejecución eager, y atención fusionada frente a la MHA antes y después de
+entrenar (se omiten si TensorFlow no está instalado)
+
+Uso:
+    python -m unittest discover -s "AMIIA C/tests"
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_numpy_runtime import build_contexts  # noqa: E402
+
+HAS_TENSORFLOW = importlib.util.find_spec("tensorflow") is not None
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, "requiere TensorFlow")
+class CompiledInferenceTest(unittest.TestCase):
+
+    def test_infer_traces_once_per_signature(self):
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(compiled_inference=True)
+        features = network.feature_encoder.encode_batch(build_contexts(8))
+        network.infer(features[:1])
+        network.infer(features[1:2])
+        network.infer(features[2:6])  # el batch es variable en la firma
+        self.assertEqual(network._compiled_inference.experimental_get_tracing_count(), 1)
+
+    def test_compiled_matches_eager(self):
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(compiled_inference=True)
+        features = network.feature_encoder.encode_batch(build_contexts(4))
+        compiled = network.infer(features)
+        eager = network._inference_step(features)
+        for key in ('consciousness_state', 'awareness_level', 'coherence_level'):
+            np.testing.assert_allclose(np.asarray(compiled[key]), np.asarray(eager[key]), atol=1e-5)
+
+    def test_temporal_cycles_do_not_retrace(self):
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(compiled_inference=True, attention_mode='temporal', attention_window=4)
+        for context in build_contexts(6):
+            network.forward(context)
+        self.assertEqual(len(network.internal_state['consciousness_history']), 6)
+        self.assertEqual(network._compiled_inference.experimental_get_tracing_count(), 1)
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, "requiere TensorFlow")
+class FusedAttentionTest(unittest.TestCase):
+
+    def assert_matches_unfused(self, network, features):
+        fused = network.infer(features)
+        # La misma red por la ruta de la MHA (modo leído en Python, ejecución eager)
+        network.consciousness_attention.mode = 'standard'
+        try:
+            unfused = network._inference_step(features)
+        finally:
+            network.consciousness_attention.mode = 'fused'
+        for key in ('consciousness_state', 'awareness_level', 'coherence_level'):
+            np.testing.assert_allclose(np.asarray(fused[key]), np.asarray(unfused[key]), atol=1e-5)
+        return np.asarray(fused['consciousness_state'])
+
+    def test_fused_matches_unfused_before_and_after_training(self):
+        import tensorflow as tf
+        from tensorflow import keras
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(attention_mode='fused')
+        network.compile(optimizer=keras.optimizers.Adam(learning_rate=1e-2))
+        features = network.feature_encoder.encode_batch(build_contexts(8))
+        before = self.assert_matches_unfused(network, features)
+
+        with tf.GradientTape() as tape:
+            outputs = network(features, training=True, update_internal_state=False)
+            loss = tf.reduce_mean(tf.square(outputs['consciousness_state'] - 1.0))
+        gradients = tape.gradient(loss, network.trainable_variables)
+        network.optimizer.apply_gradients(
+            [(g, v) for g, v in zip(gradients, network.trainable_variables) if g is not None]
+        )
+
+        after = self.assert_matches_unfused(network, features)
+        self.assertGreater(np.max(np.abs(after - before)), 1e-4)  # el paso cambió los pesos
+
+    def test_set_weights_marks_fused_attention_stale(self):
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(attention_mode='fused')
+        features = network.feature_encoder.encode_batch(build_contexts(4))
+        network.infer(features)
+        # Escalar todos los pesos (también la matriz fusionada): solo coincide si se recalcula
+        network.set_weights([weight * 1.5 for weight in network.get_weights()])
+        self.assert_matches_unfused(network, features)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Pruebas de regresión de InferenceBatcher - AMIIA-C
+El nivel de conciencia guardado en las huellas es el que produjo la red, y el
+batcher rechaza peticiones tras cerrarse
+
+Uso:
+    python -m unittest discover -s "AMIIA C/tests"
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.autobiographical_memory import AutobiographicalMemory  # noqa: E402
+from neural_networks.inference_batcher import InferenceBatcher  # noqa: E402
+
+# Estado emocional con significancia suficiente para que la experiencia se guarde
+SIGNIFICANT_EMOTION = {
+    'primary_emotion': 'curiosity',
+    'primary_intensity': 1.0,
+    'emotional_complexity_score': 1.0,
+    'empathetic_response': {'empathy_level': 1.0},
+}
+
+
+class FixedNetwork:
+    """Red de prueba: el estado de cada contexto lleva su `level` en todas las dimensiones."""
+
+    consciousness_dim = 4
+
+    def forward_batch(self, contexts):
+        return np.array([[context['level']] * self.consciousness_dim for context in contexts],
+                        dtype=np.float32)
+
+
+class InferenceBatcherTest(unittest.TestCase):
+
+    def test_stored_consciousness_level_matches_network_output(self):
+        levels = [0.125, 0.25, 0.75, 0.875]
+
+        async def run():
+            batcher = InferenceBatcher(FixedNetwork(), max_batch_size=4, max_wait_ms=5.0)
+            states = await asyncio.gather(*(batcher.forward({'level': level}) for level in levels))
+            await batcher.close()
+            self.assertEqual(batcher.get_metrics()['failed_batches'], 0)
+
+            memory = AutobiographicalMemory()
+            traces = [await memory.encode_experience(datetime.now(), state, SIGNIFICANT_EMOTION,
+                                                     ['pensamiento'], {})
+                      for state in states]
+            return [trace.consciousness_level for trace in traces]
+
+        stored = asyncio.run(run())
+        self.assertEqual(stored, levels)
+        self.assertTrue(all(isinstance(level, float) for level in stored))
+
+    def test_forward_after_close_raises(self):
+        async def run():
+            batcher = InferenceBatcher(FixedNetwork())
+            await batcher.forward({'level': 0.5})
+            await batcher.close()
+            with self.assertRaises(RuntimeError):
+                await batcher.forward({'level': 0.5})
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Pruebas del runtime NumPy frente a ConsciousnessNetwork - AMIIA-C
+Exportar una red TensorFlow a .npz y validar que el runtime NumPy reproduce sus
+salidas dentro de la tolerancia (se omiten si TensorFlow no está instalado)
+
+Uso:
+    python -m unittest discover -s "AMIIA C/tests"
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neural_networks.numpy_runtime import ATTENTION_MODES, NumpyConsciousnessRuntime, validate_runtime  # noqa: E402
+
+HAS_TENSORFLOW = importlib.util.find_spec("tensorflow") is not None
+
+
+def build_contexts(n: int):
+    """Contextos pequeños con las claves que produce WorkingMemory."""
+    return [{
+        'integrated_thoughts': [f"pensamiento {i} sobre la conciencia", "reflexión sobre el aprendizaje"],
+        'integrated_emotions': {'curiosity': 0.1 * (i % 10), 'joy': 0.5},
+        'integrated_memories': [{'id': j} for j in range(i % 3)],
+        'context_buffer': [{'user_input': f"mensaje del usuario {i}"}],
+        'working_memory_load': (i % 8) / 8,
+        'attention_summary': {'peak': 0.4, 'mean': 0.2, 'newest': 0.3},
+    } for i in range(n)]
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, "requiere TensorFlow")
+class NumpyRuntimeValidationTest(unittest.TestCase):
+
+    def export(self, network):
+        path = os.path.join(tempfile.mkdtemp(), "consciousness_weights.npz")
+        network.export_numpy_weights(path)
+        return NumpyConsciousnessRuntime.load(path)
+
+    def test_runtime_matches_tensorflow_in_every_attention_mode(self):
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        for mode in ATTENTION_MODES:
+            with self.subTest(attention_mode=mode):
+                network = ConsciousnessNetwork(attention_mode=mode)
+                runtime = self.export(network)
+                features = network.feature_encoder.encode_batch(build_contexts(16))
+                report = validate_runtime(network, runtime, features, atol=1e-4)
+                self.assertTrue(report['passed'], report['max_abs_error'])
+
+    def test_temporal_attention_matches_with_history(self):
+        # Con varios estados previos el softmax ya no vale 1: comprueba también query y key
+        from neural_networks.consciousness_network import ConsciousnessNetwork
+
+        network = ConsciousnessNetwork(attention_mode='temporal', attention_window=4)
+        runtime = self.export(network)
+        for context in build_contexts(6):
+            network.forward(context)
+            runtime.forward(context)
+        features = network.feature_encoder.encode_batch(build_contexts(8))
+        report = validate_runtime(network, runtime, features, atol=1e-4)
+        self.assertTrue(report['passed'], report['max_abs_error'])
+
+
+if __name__ == "__main__":
+    unittest.main()
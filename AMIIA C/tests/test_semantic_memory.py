@@ -0,0 +1,121 @@
+"""
+Pruebas de regresión de SemanticMemory - AMIIA-C
+Desempate por antigüedad en las consultas top-k con vectores idénticos,
+compactación automática del log persistente e índice IVF guardado en disco
+
+Uso:
+    python -m unittest discover -s "AMIIA C/tests"
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.semantic_memory import SemanticMemory  # noqa: E402
+
+DUPLICATE_TEXT = "conciencia memoria emoción"
+
+
+def add_duplicates(memory: SemanticMemory, n: int):
+    """Memorias impares con el mismo texto (vectores idénticos), pares con textos distintos."""
+    for i in range(n):
+        memory.add_memory(str(i), DUPLICATE_TEXT if i % 2 else f"texto distinto número {i}")
+
+
+class TopKTieBreakTest(unittest.TestCase):
+
+    def test_duplicate_vectors_prefer_oldest(self):
+        memory = SemanticMemory(embedding_dim=64, max_items=32)
+        add_duplicates(memory, 20)
+        hits = memory.query(DUPLICATE_TEXT, top_k=3)
+        self.assertEqual([hit["id"] for hit in hits], ["1", "3", "5"])
+
+    def test_duplicate_vectors_prefer_oldest_after_wraparound(self):
+        memory = SemanticMemory(embedding_dim=64, max_items=8)
+        add_duplicates(memory, 20)
+        # Quedan las memorias 12..19; las duplicadas son 13, 15, 17 y 19
+        hits = memory.query(DUPLICATE_TEXT, top_k=2)
+        self.assertEqual([hit["id"] for hit in hits], ["13", "15"])
+
+    def test_query_many_matches_query(self):
+        memory = SemanticMemory(embedding_dim=64, max_items=64)
+        add_duplicates(memory, 40)
+        batched = memory.query_many([DUPLICATE_TEXT], top_k=4)[0]
+        self.assertEqual([hit["id"] for hit in batched],
+                         [hit["id"] for hit in memory.query(DUPLICATE_TEXT, top_k=4)])
+
+    def test_ivf_probing_every_list_matches_exact_scan(self):
+        exact = SemanticMemory(embedding_dim=64, max_items=256)
+        ivf = SemanticMemory(embedding_dim=64, max_items=256, index="ivf",
+                             index_params={"nlist": 4, "nprobe": 4, "train_size": 64})
+        for memory in (exact, ivf):
+            add_duplicates(memory, 200)
+        for top_k in (1, 3, 10):
+            expected = [hit["id"] for hit in exact.query(DUPLICATE_TEXT, top_k=top_k)]
+            self.assertEqual([hit["id"] for hit in ivf.query(DUPLICATE_TEXT, top_k=top_k)], expected)
+
+
+class StorageCompactionTest(unittest.TestCase):
+
+    def test_duplicate_merges_keep_log_bounded(self):
+        directory = tempfile.mkdtemp()
+        memory = SemanticMemory(embedding_dim=64, max_items=20, storage_path=directory, dedup=True)
+        add_duplicates(memory, 400)
+        hits = [hit["id"] for hit in memory.query(DUPLICATE_TEXT, top_k=3)]
+        memory.close()
+        with open(os.path.join(directory, "items.log"), "rb") as f:
+            records = sum(1 for _ in f)
+        # Vigentes + a lo sumo otros tantos obsoletos antes de la siguiente compactación
+        self.assertLessEqual(records, 2 * 20 + 1)
+
+        reopened = SemanticMemory(embedding_dim=64, max_items=20, storage_path=directory, dedup=True)
+        # El contador de registros vive en la cabecera de slots.idx: abrir no relee el log
+        self.assertEqual(int(reopened.storage._slots[1]), records)
+        self.assertEqual([hit["id"] for hit in reopened.query(DUPLICATE_TEXT, top_k=3)], hits)
+        reopened.close()
+
+
+class IVFPersistenceTest(unittest.TestCase):
+
+    def open_memory(self, directory):
+        return SemanticMemory(embedding_dim=64, max_items=256, storage_path=directory, index="ivf",
+                              index_params={"nlist": 4, "nprobe": 2, "train_size": 64})
+
+    def test_reopen_reuses_centroids_and_lists(self):
+        directory = tempfile.mkdtemp()
+        memory = self.open_memory(directory)
+        add_duplicates(memory, 300)
+        centroids = memory.index.centroids.copy()
+        expected = [hit["id"] for hit in memory.query("texto distinto número 7", top_k=5)]
+        memory.close()
+
+        reopened = self.open_memory(directory)
+        np.testing.assert_array_equal(reopened.index.centroids, centroids)
+        self.assertEqual(reopened.index.get_stats()["indexed"], 256)
+        self.assertEqual([hit["id"] for hit in reopened.query("texto distinto número 7", top_k=5)], expected)
+        reopened.close()
+
+    def test_stale_index_file_keeps_centroids_and_reassigns(self):
+        directory = tempfile.mkdtemp()
+        memory = self.open_memory(directory)
+        add_duplicates(memory, 100)
+        memory.flush()
+        centroids = memory.index.centroids.copy()
+        for i in range(100, 150):
+            memory.add_memory(str(i), f"texto posterior número {i}")
+        memory.storage.flush()  # vectores en disco, índice sin volcar
+
+        reopened = self.open_memory(directory)
+        np.testing.assert_array_equal(reopened.index.centroids, centroids)
+        self.assertEqual(reopened.index.get_stats()["indexed"], 150)
+        self.assertEqual(reopened.query("texto posterior número 120", top_k=1)[0]["id"], "120")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()